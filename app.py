@@ -1,16 +1,48 @@
+import time
+
+run_started = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-from geopy.distance import geodesic
 import pydeck as pdk
-import base64
-import datetime
-import openpyxl
+
+from tankerwatch import warmup
+from tankerwatch.coverage import COVERAGE_METRICS
+from tankerwatch.data import DEFAULT_LOCATION, LOCATION_PRESETS, TANKER_COLUMNS
+from tankerwatch.deck import cached_deck, payload_sizes
+from tankerwatch.dispatch import DISPATCH_COSTS, FIRE_COLUMNS, assign
+from tankerwatch.feed import FEED_INTERVAL_S, FEED_SOURCE, PositionFeed
+from tankerwatch.fleet import FleetState
+from tankerwatch.timing import Timings, append_jsonl, to_jsonl
+
+# Only the first run in a process actually imports anything
+warmup.note("import_ms", (time.perf_counter() - run_started) * 1e3)
 
 # --------------------------
 # Configuration & API Key
 # --------------------------
 st.set_page_config(page_title="Wildfire …", layout="wide")
 
+
+def begin_timings(scope):
+    """Start recording stage timings; spans are no-ops unless the panel is on"""
+    timings = Timings(enabled=st.session_state.get("perf_panel", False), scope=scope)
+    st.session_state["perf_timings"] = timings
+    return timings
+
+
+def finish_timings(timings):
+    if timings.enabled:
+        timings.finish()
+        history = st.session_state.setdefault("perf_history", [])
+        history.append(timings)
+        del history[:-100]
+        append_jsonl([timings])
+    timings.finished = True
+
+
+timings = begin_timings("app")
+
 # Inject CSS for modern styling
 st.markdown(
     """
@@ -182,101 +214,83 @@ st.markdown(
     '<h1 class="main-title">🔥 TankerWatch Wildfire Response System</h1>',
     unsafe_allow_html=True,
 )
-map_placeholder = st.container()
 pdk.settings.mapbox_api_key = st.secrets["mapbox"]["api_key"]
 
 
 # --------------------------
-# Utility Functions
+# Load Data
 # --------------------------
-def distance_nm(coord1, coord2):
-    return geodesic(coord1, coord2).nautical
+@st.cache_resource
+def load_engine():
+    """Load reference data and build its indexes once per process"""
+    return warmup.engine()
 
 
-def get_airport_coords(icao_code):
-    match = airport_df[airport_df["ICAO"] == icao_code]
-    if not match.empty:
-        return (match.iloc[0]["LAT"], match.iloc[0]["LON"])
-    return None
+@st.cache_resource
+def load_positions():
+    """Daily tanker position store shared by all sessions"""
+    return warmup.positions()
 
 
-def compute_tanker_distance(row):
-    coords = get_airport_coords(row["Airport"])
-    if coords:
-        return distance_nm(wildfire_location, coords)
-    return None
+@st.cache_resource
+def load_coverage():
+    """Coverage raster over the western US, shared and updated incrementally"""
+    return warmup.coverage_grid()
 
 
-def encode_image_to_base64(file_path):
-    with open(file_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+@st.cache_resource
+def load_feed():
+    """Live position feed (TANKERWATCH_FEED), read on one background thread"""
+    if not FEED_SOURCE:
+        return None
+    return PositionFeed(FEED_SOURCE, min_interval=FEED_INTERVAL_S).start()
 
 
+with timings.span("load_resources"):
+    engine = load_engine()
+    positions = load_positions()
+    feed = load_feed()
+with timings.span("ingest_positions") as counters:
+    # Picks up new EOD sheets; unchanged files are skipped
+    counters["new_days"] = len(positions.ingest())
+
 # --------------------------
-# Load Data
+# Fire Location State
 # --------------------------
-@st.cache_data
-def load_airport_data():
-    """Load and process airport data from Excel file"""
-    df = pd.read_excel("AirTankerBases_2025_with_ICAO_codes.xlsx", engine="openpyxl")
-    # Rename columns to match the expected format
-    df.rename(
-        columns={
-            "Airport": "Name",
-            "ICAO": "ICAO",
-            "latitude_deg": "LAT",
-            "longitude_deg": "LON",
-        },
-        inplace=True,
-    )
+st.session_state.setdefault("wildfire_lat", DEFAULT_LOCATION[0])
+st.session_state.setdefault("wildfire_lon", DEFAULT_LOCATION[1])
+st.session_state.setdefault("lat_input", st.session_state["wildfire_lat"])
+st.session_state.setdefault("lon_input", st.session_state["wildfire_lon"])
+st.session_state.setdefault("auto_update", True)
 
-    # Add missing columns with default values
-    df["Elevation"] = "N/A"  # or you can leave this empty if not needed
-    df["# of Runways"] = "N/A"  # or you can leave this empty if not needed
-
-    return df[
-        [
-            "Name",
-            "ICAO",
-            "LAT",
-            "LON",
-            "Elevation",
-            "# of Runways",
-            "Region",
-            "County",
-            "State",
-        ]
-    ].dropna(subset=["LAT", "LON", "ICAO"])
-
-
-@st.cache_data
-def load_tanker_data():
-    """Load and process tanker data from Excel file"""
-    df = pd.read_excel("eod_loc_July7.xlsx", engine="openpyxl")
-    df.rename(
-        columns={"TailNumber": "Tanker Number", "Type": "Aircraft Type"}, inplace=True
-    )
-    df.columns = df.columns.map(str)
-    for col in df.columns:
-        if "2025" in col or "Jul" in col:
-            df.rename(columns={col: "Airport"}, inplace=True)
-            break
-    return df[["Tanker Number", "Aircraft Type", "Airport"]]
 
+def set_fire_location(lat, lon):
+    """Apply a fire location; runs as a callback, before the rerun it triggers"""
+    st.session_state["wildfire_lat"] = lat
+    st.session_state["wildfire_lon"] = lon
+    st.session_state["lat_input"] = lat
+    st.session_state["lon_input"] = lon
 
-# Load data
-airport_df = load_airport_data()
-tanker_df = load_tanker_data()
 
-# Modern Wildfire Coordinates Input with Auto-Update
-# --------------------------
-with st.sidebar:
-    st.markdown("### 🎯 Wildfire Location Control")
-    st.markdown("---")
+def apply_coordinate_inputs():
+    set_fire_location(st.session_state["lat_input"], st.session_state["lon_input"])
+
 
-    # Current location display
-    current_lat = st.session_state.get("wildfire_lat", 37.0)
-    current_lon = st.session_state.get("wildfire_lon", -120.0)
+def on_coordinate_change():
+    # With auto-update off, edits stay pending so that changing both
+    # coordinates costs a single recompute when the button is pressed.
+    if st.session_state["auto_update"]:
+        apply_coordinate_inputs()
+
+
+def applied_location():
+    return (st.session_state["wildfire_lat"], st.session_state["wildfire_lon"])
+
+
+@st.fragment
+def location_controls():
+    """Coordinate inputs; edits rerun only this fragment until applied"""
+    current_lat, current_lon = applied_location()
 
     st.markdown(
         f"""
@@ -294,27 +308,84 @@ with st.sidebar:
 
     col1, col2 = st.columns(2)
     with col1:
-        input_lat = st.number_input(
-            "🌐 Latitude", value=current_lat, format="%.6f", step=None, key="lat_input"
+        st.number_input(
+            "🌐 Latitude",
+            format="%.6f",
+            step=None,
+            key="lat_input",
+            on_change=on_coordinate_change,
         )
     with col2:
-        input_lon = st.number_input(
-            "🌐 Longitude", value=current_lon, format="%.6f", step=None, key="lon_input"
+        st.number_input(
+            "🌐 Longitude",
+            format="%.6f",
+            step=None,
+            key="lon_input",
+            on_change=on_coordinate_change,
         )
 
-    # Auto-update when input values change
-    if input_lat != current_lat or input_lon != current_lon:
-        st.session_state["wildfire_lat"] = input_lat
-        st.session_state["wildfire_lon"] = input_lon
-        st.rerun()
+    st.toggle("⚡ Auto-update on change", key="auto_update")
+    pending = (
+        st.session_state["lat_input"],
+        st.session_state["lon_input"],
+    ) != applied_location()
+    st.button(
+        "🔄 Update Fire Location",
+        use_container_width=True,
+        disabled=not pending,
+        on_click=apply_coordinate_inputs,
+    )
+    if pending:
+        st.caption("⏳ Coordinates changed but not applied yet")
+
+    # Only a change of the applied location needs the rest of the page.
+    if applied_location() != st.session_state.get("rendered_location"):
+        st.rerun(scope="app")
+
+
+# Modern Wildfire Coordinates Input with Auto-Update
+# --------------------------
+st.session_state["rendered_location"] = applied_location()
+
+with st.sidebar:
+    st.markdown("### 🎯 Wildfire Location Control")
+    st.markdown("---")
+
+    location_controls()
+
+    nearest_k = st.slider(
+        "🏆 Closest bases to show", min_value=1, max_value=10, value=3, key="nearest_k"
+    )
+
+    position_dates = positions.dates()[::-1]
+    positions_date = st.selectbox(
+        "📅 Tanker positions as of",
+        position_dates,
+        format_func=lambda date: date.strftime("%b %d, %Y"),
+        key="positions_date",
+    )
+
+    coverage_metric = None
+    if st.toggle("🌡️ Coverage heatmap", key="coverage_on"):
+        coverage_metric = st.selectbox(
+            "Shade by",
+            list(COVERAGE_METRICS),
+            format_func=lambda metric: "{} ({})".format(*COVERAGE_METRICS[metric]),
+            key="coverage_metric",
+        )
+        _, unit, top, band = COVERAGE_METRICS[coverage_metric]
+        st.caption(
+            f"Green under {band} {unit} through dark red at {top}+ {unit}, "
+            f"in {band} {unit} bands"
+        )
 
-    # Manual update button (now optional)
-    if st.button("🔄 Update Fire Location", use_container_width=True):
-        with st.spinner("🔄 Updating fire location..."):
-            st.session_state["wildfire_lat"] = input_lat
-            st.session_state["wildfire_lon"] = input_lon
-            st.success("✅ Fire location updated!")
-            st.rerun()
+    dispatch_on = st.toggle("🚒 Multi-fire dispatch", key="dispatch_on")
+    cluster_labels = st.toggle(
+        "🏷️ Group crowded tankers",
+        value=True,
+        key="cluster_labels",
+        help="Tankers that do not fit around a busy airport show as a +N badge",
+    )
 
     st.markdown("---")
 
@@ -332,6 +403,9 @@ with st.sidebar:
         <div style="margin: 8px 0;">
             <span style="font-size: 24px;">✈️</span> <small>Air Tankers</small>
         </div>
+        <div style="margin: 8px 0;">
+            <span style="font-size: 24px;">🔴</span> <small>Grouped Tankers (+N)</small>
+        </div>
         <div style="margin: 8px 0;">
             <span style="font-size: 24px;">📏</span> <small>Distance Lines</small>
         </div>
@@ -344,446 +418,427 @@ with st.sidebar:
 
     # Quick location presets
     st.markdown("### 🗺️ Quick Locations")
-    location_presets = {
-        "🏔️ Northern California": (39.7392, -121.8375),
-        "🌲 Oregon": (44.0521, -121.3153),
-        "🏜️ Southern California": (34.0522, -118.2437),
-        "🌵 Arizona": (34.0489, -111.0937),
-        "🌲 Washington": (47.6062, -122.3321),
-        "⛰️ Colorado": (39.5501, -105.7821),
-    }
-
-    for name, (lat, lon) in location_presets.items():
-        if st.button(name, use_container_width=True):
-            with st.spinner(f"🌍 Setting location to {name}..."):
-                st.session_state["wildfire_lat"] = lat
-                st.session_state["wildfire_lon"] = lon
-                st.success(f"✅ Set to {name}")
-                st.rerun()
+    for name, (lat, lon) in LOCATION_PRESETS.items():
+        st.button(
+            name,
+            use_container_width=True,
+            on_click=set_fire_location,
+            args=(lat, lon),
+        )
 
-lat = st.session_state.get("wildfire_lat", 37.0)
-lon = st.session_state.get("wildfire_lon", -120.0)
-wildfire_location = (lat, lon)
 
 # --------------------------
-# Nearest Bases Calculation
+# Fire Response View
 # --------------------------
-airport_df["Distance to Fire (nm)"] = airport_df.apply(
-    lambda row: distance_nm(wildfire_location, (row["LAT"], row["LON"])), axis=1
-)
-closest_bases = airport_df.nsmallest(3, "Distance to Fire (nm)").copy()
-closest_bases["Distance to Fire (nm)"] = closest_bases["Distance to Fire (nm)"].round(1)
+@st.fragment(run_every=FEED_INTERVAL_S if feed else None)
+def response_view(
+    wildfire_location,
+    nearest_k,
+    positions_date,
+    coverage_metric,
+    dispatch_on,
+    cluster_labels,
+):
+    """Map, tables and tanker editor; edits and feed updates rerun only this fragment"""
+    timings = st.session_state["perf_timings"]
+    fragment_run = timings.finished
+    if fragment_run:
+        timings = begin_timings("response_view")
+
+    map_placeholder = st.container()
+    with timings.span("positions_as_of") as counters:
+        tanker_df = positions.as_of(positions_date)[TANKER_COLUMNS]
+        counters["rows"] = len(tanker_df)
 
-# --------------------------
-# Modern Editable Tanker Table + Distances
-# --------------------------
-st.markdown("### ✏️ Air Tankers / Scoopers Location Management")
-st.markdown(
-    """
-<div style="background: linear-gradient(135deg, #e3f2fd 0%, #f3e5f5 100%); 
-            padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #2196F3;">
-    <div style="display: flex; align-items: center;">
-        <span style="font-size: 24px; margin-right: 10px;">💡</span>
-        <div>
-            <strong>Interactive Table:</strong> Edit aircraft locations, add new tankers, or remove existing ones.<br>
-            <small>Changes will automatically update distances and map markers.</small>
+    # --------------------------
+    # Nearest Bases Calculation
+    # --------------------------
+    with timings.span("nearest_bases", rows=len(engine.bases)):
+        closest_bases = engine.nearest_bases(wildfire_location, nearest_k)
+
+    # --------------------------
+    # Modern Editable Tanker Table + Distances
+    # --------------------------
+    st.markdown("### ✏️ Air Tankers / Scoopers Location Management")
+    st.markdown(
+        """
+    <div style="background: linear-gradient(135deg, #e3f2fd 0%, #f3e5f5 100%); 
+                padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #2196F3;">
+        <div style="display: flex; align-items: center;">
+            <span style="font-size: 24px; margin-right: 10px;">💡</span>
+            <div>
+                <strong>Interactive Table:</strong> Edit aircraft locations, add new tankers, or remove existing ones.<br>
+                <small>Changes will automatically update distances and map markers.</small>
+            </div>
         </div>
     </div>
-</div>
-""",
-    unsafe_allow_html=True,
-)
-
-with st.spinner("📊 Loading tanker data..."):
-    editable_tankers = st.data_editor(
-        tanker_df,
-        use_container_width=True,
-        num_rows="dynamic",
-        key="tanker_editor",
-        hide_index=True,
-        column_config={
-            "Tanker Number": st.column_config.TextColumn(
-                "🚁 Tanker Number",
-                help="Aircraft tail number or identifier",
-                width="medium",
-            ),
-            "Aircraft Type": st.column_config.TextColumn(
-                "✈️ Aircraft Type",
-                help="Type of aircraft (e.g., DC-10, C-130)",
-                width="medium",
-            ),
-            "Airport": st.column_config.TextColumn(
-                "📍 Airport Code",
-                help="ICAO airport code where aircraft is located",
-                width="medium",
-            ),
-        },
-    )
-
-    # Safely convert to DataFrame
-    if not isinstance(editable_tankers, pd.DataFrame):
-        if isinstance(editable_tankers, dict):
-            # Handle the dictionary properly
-            if "edited_rows" in editable_tankers:
-                # Use the original data and apply edits
-                editable_tankers = tanker_df.copy()
-            else:
-                # Convert dict to DataFrame more safely
-                try:
-                    editable_tankers = pd.DataFrame.from_dict(
-                        editable_tankers, orient="index"
-                    ).T
-                except:
-                    editable_tankers = tanker_df.copy()
-        else:
-            editable_tankers = tanker_df.copy()
-
-    # Now safely apply the distance calculation
-    editable_tankers["Distance to Fire (nm)"] = editable_tankers.apply(
-        compute_tanker_distance, axis=1
+    """,
+        unsafe_allow_html=True,
     )
-st.markdown("---")
 
-# --------------------------
-# Prepare Tanker Data for Map
-# --------------------------
-# editable_tankers = st.session_state.get("tanker_editor", tanker_df.copy())
-
-# # Safely convert to DataFrame
-# if not isinstance(editable_tankers, pd.DataFrame):
-#     if isinstance(editable_tankers, dict):
-#         # Handle the dictionary properly
-#         if 'edited_rows' in editable_tankers:
-#             # Use the original data and apply edits
-#             editable_tankers = tanker_df.copy()
-#         else:
-#             # Convert dict to DataFrame more safely
-#             try:
-#                 editable_tankers = pd.DataFrame.from_dict(editable_tankers, orient='index').T
-#             except:
-#                 editable_tankers = tanker_df.copy()
-#     else:
-#         editable_tankers = tanker_df.copy()
-
-# editable_tankers["Distance to Fire (nm)"] = editable_tankers.apply(compute_tanker_distance, axis=1)
-# Plot Air Tankers on the Map
-valid_tankers = editable_tankers.copy()
-valid_tankers["coords"] = valid_tankers["Airport"].apply(get_airport_coords)
-valid_tankers = valid_tankers.dropna(subset=["coords"])
-valid_tankers["LAT"] = valid_tankers["coords"].apply(lambda x: x[0])
-valid_tankers["LON"] = valid_tankers["coords"].apply(lambda x: x[1])
-valid_tankers["icon_data"] = [
-    {
-        "url": f"data:image/png;base64,{encode_image_to_base64('plane.png')}",
-        "width": 64,
-        "height": 64,
-        "anchorY": 64,
-    }
-] * len(valid_tankers)
-
-# Add offset to tanker icons for multiple tankers at same airport
-valid_tankers["offset_index"] = valid_tankers.groupby("Airport").cumcount()
-valid_tankers["LAT_offset"] = valid_tankers["LAT"] + (
-    valid_tankers["offset_index"] * 0.01
-)
-valid_tankers["LON_offset"] = valid_tankers["LON"] + (
-    valid_tankers["offset_index"] * 0.01
-)
+    with st.spinner("📊 Loading tanker data..."):
+        with timings.span("tanker_editor", rows=len(tanker_df)):
+            st.data_editor(
+                tanker_df,
+                use_container_width=True,
+                num_rows="dynamic",
+                key=f"tanker_editor_{positions_date}",
+                hide_index=True,
+                column_config={
+                    "Tanker Number": st.column_config.TextColumn(
+                        "🚁 Tanker Number",
+                        help="Aircraft tail number or identifier",
+                        width="medium",
+                    ),
+                    "Aircraft Type": st.column_config.TextColumn(
+                        "✈️ Aircraft Type",
+                        help="Type of aircraft (e.g., DC-10, C-130)",
+                        width="medium",
+                    ),
+                    "Airport": st.column_config.TextColumn(
+                        "📍 Airport Code",
+                        help="ICAO airport code where aircraft is located",
+                        width="medium",
+                    ),
+                },
+            )
 
-tanker_layer = pdk.Layer(
-    "IconLayer",
-    data=valid_tankers,
-    get_icon="icon_data",
-    get_position="[LON_offset, LAT_offset]",
-    get_size=4,
-    size_scale=10,
-    pickable=True,
-)
+        # Apply only the editor's deltas instead of rescoring the whole fleet
+        # One fleet state per positions date; edits to each are kept separately
+        fleet = st.session_state.get(f"fleet_state_{positions_date}")
+        if fleet is None:
+            fleet = FleetState(tanker_df, engine.icao_index)
+            st.session_state[f"fleet_state_{positions_date}"] = fleet
+        with timings.span("apply_edits") as counters:
+            edits = st.session_state.get(f"tanker_editor_{positions_date}")
+            counters["rows"] = len(fleet.apply_edits(edits))
+        if feed is not None:
+            # Only reports published since this session last looked
+            with timings.span("apply_feed") as counters:
+                seen = st.session_state.get(f"feed_seq_{positions_date}", 0)
+                reports, seq = feed.latest.changes_since(seen)
+                counters["rows"] = len(fleet.apply_positions(reports))
+                st.session_state[f"feed_seq_{positions_date}"] = seq
+            st.caption(
+                f"📡 Live feed: {feed.received:,} reports, "
+                f"{len(feed.latest):,} tankers tracked"
+            )
+        with timings.span("fleet_distances", rows=len(fleet.frame)):
+            fleet.set_location(wildfire_location)
+            editable_tankers = fleet.table()
+        if fleet.unknown:
+            st.caption(
+                "⚠️ No tanker base found for airport codes: " + ", ".join(fleet.unknown)
+            )
+    st.markdown("---")
 
-# ADD TANKER LABELS with offset for multiple tankers at same airport
-tanker_label_data = valid_tankers.copy()
-tanker_label_data["label_text"] = (
-    tanker_label_data["Tanker Number"] + "\n" + tanker_label_data["Airport"]
-)
+    # --------------------------
+    # Map Layers Setup
+    # --------------------------
+    valid_tankers = fleet.placed()
 
-# Add offset for multiple tankers at same airport
-offset_factor = 0.01  # Adjust this to control spacing
-tanker_label_data["offset_index"] = tanker_label_data.groupby("Airport").cumcount()
-tanker_label_data["LAT_offset"] = tanker_label_data["LAT"] + (
-    tanker_label_data["offset_index"] * offset_factor
-)
-tanker_label_data["LON_offset"] = tanker_label_data["LON"] + (
-    tanker_label_data["offset_index"] * offset_factor
-)
+    # --------------------------
+    # Multi-Fire Dispatch
+    # --------------------------
+    assignment = None
+    if dispatch_on:
+        st.markdown("### 🚒 Multi-Fire Dispatch")
+        st.markdown(
+            "*Each tanker goes to at most one fire; the assignment minimizes "
+            "the total over all fires*"
+        )
+        # Seeded once so moving the main fire does not reset the table
+        dispatch_fires = st.session_state.setdefault(
+            "dispatch_fires_start",
+            pd.DataFrame([["Fire 1", *wildfire_location, 2]], columns=FIRE_COLUMNS),
+        )
+        fires_df = st.data_editor(
+            dispatch_fires,
+            use_container_width=True,
+            num_rows="dynamic",
+            key="dispatch_fires",
+            hide_index=True,
+            column_config={
+                "Fire": st.column_config.TextColumn("🔥 Fire", width="medium"),
+                "LAT": st.column_config.NumberColumn(
+                    "📍 Latitude", min_value=-90.0, max_value=90.0, format="%.4f"
+                ),
+                "LON": st.column_config.NumberColumn(
+                    "📍 Longitude", min_value=-180.0, max_value=180.0, format="%.4f"
+                ),
+                "Tankers": st.column_config.NumberColumn(
+                    "✈️ Tankers needed", min_value=0, max_value=50, step=1
+                ),
+            },
+        )
+        dispatch_cost = st.radio(
+            "Minimize",
+            list(DISPATCH_COSTS),
+            format_func=DISPATCH_COSTS.get,
+            horizontal=True,
+            key="dispatch_cost",
+        )
+        with timings.span("dispatch") as counters:
+            assignment = assign(fires_df, valid_tankers, dispatch_cost)
+            counters["fires"] = len(assignment.fires)
+            counters["tankers"] = len(valid_tankers)
+        st.dataframe(
+            assignment.table,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Distance (nm)": st.column_config.NumberColumn(
+                    "🎯 Distance (nm)", format="%.1f"
+                ),
+                "ETA (min)": st.column_config.NumberColumn(
+                    "⏱️ ETA (min)", format="%.0f"
+                ),
+            },
+        )
+        if assignment.unfilled:
+            st.caption(
+                f"⚠️ {assignment.unfilled} requested tanker(s) could not be filled; "
+                "every available tanker is already assigned."
+            )
+    coverage = None
+    if coverage_metric:
+        with timings.span("coverage") as counters:
+            coverage_grid = load_coverage()
+            coverage = coverage_grid.coverage(valid_tankers, counters)
 
-# Background text layer for tankers (black shadow)
-tanker_text_bg_layer = pdk.Layer(
-    "TextLayer",
-    data=tanker_label_data,
-    get_position="[LON_offset, LAT_offset]",
-    get_text="label_text",
-    get_size=14,
-    get_color=[0, 0, 0, 200],  # Black shadow
-    get_alignment_baseline="'top'",
-    get_text_anchor="'middle'",
-    billboard=True,
-)
+    # --------------------------
+    # MODERN MAP VIEW - NOW AT THE TOP!
+    # --------------------------
+    with map_placeholder:
+        st.markdown("### 🗺️ Real-Time Wildfire Response Map")
+        with st.spinner("🗺️ Loading interactive map..."):
+            st.markdown('<div class="map-container">', unsafe_allow_html=True)
+            deck = cached_deck(
+                wildfire_location,
+                closest_bases,
+                valid_tankers,
+                pdk.settings.mapbox_api_key,
+                coverage=coverage,
+                coverage_metric=coverage_metric,
+                assignment=assignment,
+                cluster_labels=cluster_labels,
+                timings=timings,
+            )
+            with timings.span("pydeck_chart"):
+                st.pydeck_chart(deck)
+            if timings.enabled:
+                st.session_state["perf_payload"] = payload_sizes(deck)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+        # --------------------------
+        # Closest Bases Summary
+        # --------------------------
+        st.markdown(f"### 🏆 {nearest_k} Closest Air Tanker Bases to Wildfire")
+        st.markdown("*Automatically calculated based on current fire location*")
+
+        # Enhanced dataframe display
+        st.dataframe(
+            closest_bases[
+                [
+                    "Name",
+                    "ICAO",
+                    "Region",
+                    "State",
+                    "LAT",
+                    "LON",
+                    "Distance to Fire (nm)",
+                ]
+            ],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Name": st.column_config.TextColumn("🏢 Base Name", width="medium"),
+                "ICAO": st.column_config.TextColumn("🛩️ ICAO", width="small"),
+                "Region": st.column_config.TextColumn("🌍 Region", width="small"),
+                "State": st.column_config.TextColumn("🗺️ State", width="small"),
+                "LAT": st.column_config.NumberColumn("📍 Latitude", format="%.4f"),
+                "LON": st.column_config.NumberColumn("📍 Longitude", format="%.4f"),
+                "Distance to Fire (nm)": st.column_config.NumberColumn(
+                    "🎯 Distance (nm)", format="%.1f"
+                ),
+            },
+        )
 
-# Main text layer for tankers (yellow text for visibility)
-tanker_text_layer = pdk.Layer(
-    "TextLayer",
-    data=tanker_label_data,
-    get_position="[LON_offset, LAT_offset]",
-    get_text="label_text",
-    get_size=14,
-    get_color=[255, 255, 0, 255],  # Yellow text
-    get_alignment_baseline="'top'",
-    get_text_anchor="'middle'",
-    billboard=True,
-)
+        # --------------------------
+        # Alternate / Reload Airports
+        # --------------------------
+        with st.expander("🛬 Alternate & Reload Airports"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                min_runways = st.number_input(
+                    "Min runways", min_value=0, max_value=8, value=2, key="alt_runways"
+                )
+            with col2:
+                max_elevation = st.number_input(
+                    "Max elevation (ft)",
+                    min_value=0,
+                    max_value=15000,
+                    value=6000,
+                    step=500,
+                    key="alt_elevation",
+                )
+            with col3:
+                radius = st.number_input(
+                    "Within (nm)",
+                    min_value=10,
+                    max_value=1000,
+                    value=150,
+                    step=10,
+                    key="alt_radius",
+                )
+            with timings.span("alternate_airports"):
+                alternates = engine.alternate_airports(
+                    wildfire_location,
+                    k=10,
+                    radius_nm=radius,
+                    min_runways=min_runways or None,
+                    max_elevation_ft=max_elevation,
+                )
+            st.caption(
+                "Runway counts are only known for some airports; "
+                "airports without them are left out when a minimum is set."
+            )
+            st.dataframe(
+                alternates[
+                    [
+                        "Name",
+                        "ICAO",
+                        "City",
+                        "Elevation",
+                        "# of Runways",
+                        "Distance to Fire (nm)",
+                    ]
+                ],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Name": st.column_config.TextColumn("🛬 Airport", width="medium"),
+                    "ICAO": st.column_config.TextColumn("🛩️ ICAO", width="small"),
+                    "Elevation": st.column_config.NumberColumn(
+                        "⛰️ Elevation (ft)", format="%.0f"
+                    ),
+                    "# of Runways": st.column_config.NumberColumn(
+                        "🛣️ Runways", format="%.0f"
+                    ),
+                    "Distance to Fire (nm)": st.column_config.NumberColumn(
+                        "🎯 Distance (nm)", format="%.1f"
+                    ),
+                },
+            )
 
-# --------------------------
-# Map Layers Setup
-# --------------------------
-line_data = []
-for _, row in closest_bases.iterrows():
-    line_data.append(
-        {
-            "start": [lon, lat],  # Fire location
-            "end": [row["LON"], row["LAT"]],  # Base location
-        }
+    # Map controls info
+    st.markdown(
+        """
+    <div style="text-align: center; margin: 15px 0; color: #666;">
+        <small>🖱️ <strong>Map Controls:</strong> Click and drag to pan • Scroll to zoom • Hold Shift + drag to rotate</small>
+    </div>
+    """,
+        unsafe_allow_html=True,
     )
 
-line_layer = pdk.Layer(
-    "LineLayer",
-    data=pd.DataFrame(line_data),
-    get_source_position="start",
-    get_target_position="end",
-    get_color=[255, 0, 0, 200],  # Red with transparency
-    get_width=3,
-    pickable=False,
-    # Add dashed line properties
-    line_width_min_pixels=2,
-    line_width_max_pixels=5,
-    get_line_dash_array=[10, 5],  # This creates the dashed effect
-)
+    st.markdown("### 📊 Air Tankers with Calculated Distances")
+    st.markdown(
+        "*Real-time distance and arrival estimates from current fire location, "
+        "soonest first*"
+    )
 
-fire_icon_data = pd.DataFrame(
-    [
-        {
-            "lat": lat,
-            "lon": lon,
-            "icon_data": {
-                "url": f"data:image/png;base64,{encode_image_to_base64('flame.png')}",
-                "width": 64,
-                "height": 64,
-                "anchorY": 64,
+    # Enhanced results display
+    with timings.span("results_table", rows=len(editable_tankers)):
+        st.dataframe(
+            editable_tankers,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Distance to Fire (nm)": st.column_config.NumberColumn(
+                    "🎯 Distance (nm)",
+                    help="Distance from aircraft to fire location in nautical miles",
+                    format="%.1f",
+                ),
+                "ETA (min)": st.column_config.NumberColumn(
+                    "⏱️ ETA (min)",
+                    help="Spin-up plus flight time at the aircraft type's cruise speed",
+                    format="%.0f",
+                ),
+                "Drop Cycle (min)": st.column_config.NumberColumn(
+                    "🔁 Drop Cycle (min)",
+                    help="Round trip to the home base plus reload turnaround",
+                    format="%.0f",
+                ),
             },
-        }
-    ]
-)
-fire_layer = pdk.Layer(
-    "IconLayer",
-    data=fire_icon_data,
-    get_icon="icon_data",
-    get_size=4,
-    size_scale=10,
-    get_position="[lon, lat]",
-    pickable=True,
-)
+        )
 
-airport_icon_data = closest_bases.copy()
-airport_icon_data["icon_data"] = [
-    {
-        "url": f"data:image/png;base64,{encode_image_to_base64('location.png')}",
-        "width": 128,
-        "height": 128,
-        "anchorY": 128,
-    }
-] * len(closest_bases)
-airport_layer = pdk.Layer(
-    "IconLayer",
-    data=airport_icon_data,
-    get_icon="icon_data",
-    get_size=4,
-    size_scale=10,
-    get_position="[LON, LAT]",
-    pickable=True,
-)
+    if fragment_run:
+        finish_timings(timings)
 
-# ADD AIRPORT LABELS for closest bases
-airport_label_data = closest_bases.copy()
-airport_label_data["label_text"] = (
-    airport_label_data["ICAO"]
-    + "\n"
-    + airport_label_data["Name"]
-    + "\n"
-    + airport_label_data["State"]
-)
 
-# Background text layer for airports (black shadow)
-airport_text_bg_layer = pdk.Layer(
-    "TextLayer",
-    data=airport_label_data,
-    get_position="[LON, LAT]",
-    get_text="label_text",
-    get_size=16,
-    get_color=[0, 0, 0, 200],  # Black shadow
-    get_alignment_baseline="'top'",
-    get_text_anchor="'middle'",
-    billboard=True,
+response_view(
+    applied_location(),
+    nearest_k,
+    positions_date,
+    coverage_metric,
+    dispatch_on,
+    cluster_labels,
 )
-
-# Main text layer for airports (black text)
-airport_text_layer = pdk.Layer(
-    "TextLayer",
-    data=airport_label_data,
-    get_position="[LON, LAT]",
-    get_text="label_text",
-    get_size=16,
-    get_color=[0, 0, 0, 255],  # Black text
-    get_alignment_baseline="'top'",
-    get_text_anchor="'middle'",
-    billboard=True,
-)
-
-label_data = pd.DataFrame(
-    [
-        {
-            "lat": (lat + row["LAT"]) / 2,
-            "lon": (lon + row["LON"]) / 2,
-            "text": f"{row['Distance to Fire (nm)']:.0f}nm",
-        }
-        for _, row in closest_bases.iterrows()
-    ]
-)
-# Background text layer (black shadow effect)
-text_background_layer = pdk.Layer(
-    "TextLayer",
-    data=label_data,
-    get_position="[lon, lat]",
-    get_text="text",
-    get_size=20,
-    get_color=[0, 0, 0, 180],  # Semi-transparent black
-    get_alignment_baseline="'bottom'",
-    get_text_anchor="'middle'",
-    billboard=True,
-)
-
-# Main text layer (white text)
-text_layer = pdk.Layer(
-    "TextLayer",
-    data=label_data,
-    get_position="[lon, lat]",
-    get_text="text",
-    get_size=20,
-    get_color=[255, 255, 255, 255],  # Solid white
-    get_alignment_baseline="'bottom'",
-    get_text_anchor="'middle'",
-    billboard=True,
+finish_timings(timings)
+
+if "ttfr_ms" not in st.session_state:
+    # First full run of this session; in a cold process it includes imports
+    st.session_state["ttfr_ms"] = (time.perf_counter() - run_started) * 1e3
+    warmup.note("first_render_ms", st.session_state["ttfr_ms"])
+# Prime presets, decks and coverage after the first page is out (once per process)
+warmup.start_background(
+    locations=[DEFAULT_LOCATION, *LOCATION_PRESETS.values()],
+    mapbox_api_key=pdk.settings.mapbox_api_key,
 )
 
 
 # --------------------------
-# MODERN MAP VIEW - NOW AT THE TOP!
+# Performance Panel
 # --------------------------
-with map_placeholder:
-    st.markdown("### 🗺️ Real-Time Wildfire Response Map")
-    with st.spinner("🗺️ Loading interactive map..."):
-        st.markdown('<div class="map-container">', unsafe_allow_html=True)
-        st.pydeck_chart(
-            pdk.Deck(
-                map_style="mapbox://styles/mapbox/satellite-streets-v11",
-                initial_view_state=pdk.ViewState(
-                    latitude=lat, longitude=lon, zoom=7, pitch=45, bearing=0
-                ),
-                layers=[
-                    line_layer,
-                    fire_layer,
-                    airport_layer,
-                    airport_text_bg_layer,  # NEW
-                    airport_text_layer,  # NEW
-                    tanker_layer,
-                    tanker_text_bg_layer,  # NEW
-                    tanker_text_layer,  # NEW
-                    text_background_layer,  # Distance labels
-                    text_layer,  # Distance labels
-                ],
-                api_keys={"mapbox": pdk.settings.mapbox_api_key},
-                height=600,
-            )
+with st.sidebar:
+    st.markdown("---")
+    st.markdown("### 🐢 Performance")
+    st.toggle("⏱️ Record stage timings", key="perf_panel")
+    if st.session_state.get("perf_panel"):
+        cold = warmup.COLD_START
+        st.caption(
+            f"**cold start** · imports {cold.get('import_ms', 0):.0f} ms · "
+            f"first render {cold.get('first_render_ms', 0):.0f} ms · "
+            f"this session {st.session_state['ttfr_ms']:.0f} ms"
         )
-        st.markdown("</div>", unsafe_allow_html=True)
-
-    # --------------------------
-    # Closest Bases Summary
-    # --------------------------
-    st.markdown("### 🏆 3 Closest Air Tanker Bases to Wildfire")
-    st.markdown("*Automatically calculated based on current fire location*")
-
-    # Enhanced dataframe display
-    st.dataframe(
-        closest_bases[
-            [
-                "Name",
-                "ICAO",
-                "Region",
-                "State",
-                "LAT",
-                "LON",
-                "Distance to Fire (nm)",
-            ]
-        ],
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "Name": st.column_config.TextColumn("🏢 Base Name", width="medium"),
-            "ICAO": st.column_config.TextColumn("🛩️ ICAO", width="small"),
-            "Region": st.column_config.TextColumn("🌍 Region", width="small"),
-            "State": st.column_config.TextColumn("🗺️ State", width="small"),
-            "LAT": st.column_config.NumberColumn("📍 Latitude", format="%.4f"),
-            "LON": st.column_config.NumberColumn("📍 Longitude", format="%.4f"),
-            "Distance to Fire (nm)": st.column_config.NumberColumn(
-                "🎯 Distance (nm)", format="%.1f"
+        if warmup.STARTUP.finished:
+            st.caption(f"**warm-up** · {warmup.STARTUP.total_ms:.0f} ms")
+            st.dataframe(
+                warmup.STARTUP.stages, use_container_width=True, hide_index=True
+            )
+        history = st.session_state.get("perf_history", [])
+        latest = {run.scope: run for run in history}
+        for scope, run in latest.items():
+            st.caption(
+                f"**{scope}** · {run.total_ms:.0f} ms · "
+                f"{run.started_at.astimezone():%H:%M:%S}"
+            )
+            st.dataframe(run.stages, use_container_width=True, hide_index=True)
+        payload = st.session_state.get("perf_payload")
+        if payload:
+            st.caption(f"**map payload** · {payload['total'] / 1024:.1f} KB")
+            layers = pd.Series(payload).drop("total") / 1024
+            st.dataframe(
+                layers.rename_axis("layer").reset_index(name="KB"),
+                use_container_width=True,
+                hide_index=True,
+            )
+        st.download_button(
+            "⬇️ Export timings (JSONL)",
+            to_jsonl(
+                [warmup.STARTUP, *history] if warmup.STARTUP.finished else history
             ),
-        },
-    )
-
-
-# Map controls info
-st.markdown(
-    """
-<div style="text-align: center; margin: 15px 0; color: #666;">
-    <small>🖱️ <strong>Map Controls:</strong> Click and drag to pan • Scroll to zoom • Hold Shift + drag to rotate</small>
-</div>
-""",
-    unsafe_allow_html=True,
-)
-
-st.markdown("### 📊 Air Tankers with Calculated Distances")
-st.markdown("*Real-time distance calculations from current fire location*")
-
-# Enhanced results display
-st.dataframe(
-    editable_tankers,
-    use_container_width=True,
-    hide_index=True,
-    column_config={
-        "Distance to Fire (nm)": st.column_config.NumberColumn(
-            "🎯 Distance (nm)",
-            help="Distance from aircraft to fire location in nautical miles",
-            format="%.1f",
+            file_name="tankerwatch-timings.jsonl",
+            mime="application/jsonl",
+            use_container_width=True,
         )
-    },
-)
-
-# --------------------------
-# Optional Date Comparison Logic
-# --------------------------
-today = datetime.date.today()
-
-
-def row_has_today_date(row_date):
-    if isinstance(row_date, datetime.datetime):
-        row_date = row_date.date()
-    return row_date == today
@@ -0,0 +1,311 @@
+"""Micro-benchmarks for the per-rerun hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.hotpaths --output bench.json
+    python -m benchmarks.hotpaths --compare before.json after.json
+
+Each scenario uses a fixed synthetic dataset (seeded, so results are
+comparable between commits). ``--legacy`` also times the original
+per-row implementations from app.py where they finish in reasonable time.
+Results are written as JSON: one record per (benchmark, variant, size).
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from tankerwatch.cache import NearestCache
+from tankerwatch.core import base_labels, nearest_bases, score_tankers
+from tankerwatch.core import layer_frames, tanker_positions
+from tankerwatch.geodesy import distances_nm
+from tankerwatch.icao import IcaoIndex
+from tankerwatch.labels import LabelPlacer, place_labels
+from tankerwatch.spatial import BaseTree
+
+BASE_SIZES = {"small": 100, "medium": 7_747, "large": 100_000}
+FLEET_SIZES = {"small": 10, "medium": 1_000, "large": 50_000}
+# Every base-set size runs with every fleet size: label layout and airport
+# resolution depend on how many tankers share an airport, which a fixed
+# pairing would hide. Matching sizes keep their one-word names, so reports
+# from before the sizes were crossed still line up under --compare.
+SCENARIOS = {
+    (bases if bases == fleet else f"{bases}-bases/{fleet}-fleet"): (
+        BASE_SIZES[bases],
+        FLEET_SIZES[fleet],
+    )
+    for bases, fleet in itertools.product(BASE_SIZES, FLEET_SIZES)
+}
+FIRE = (39.7392, -121.8375)
+LEGACY_BUDGET = 2_000_000  # skip legacy variants above this many row operations
+
+
+def make_bases(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Name": [f"Base {i}" for i in range(n)],
+            "ICAO": [f"K{i:05d}" for i in range(n)],
+            "LAT": rng.uniform(31.0, 49.0, n),
+            "LON": rng.uniform(-124.5, -102.0, n),
+            "Elevation": "N/A",
+            "# of Runways": "N/A",
+            "Region": rng.choice(["NOCC", "SOCC", "NWCC", "GBCC"], n),
+            "County": "<Null>",
+            "State": rng.choice(["CA", "OR", "WA", "NV", "AZ"], n),
+        }
+    )
+
+
+def make_tankers(n, bases, seed=1):
+    rng = np.random.default_rng(seed)
+    airports = rng.choice(bases["ICAO"].to_numpy(), n)
+    # About 5% of tankers sit at airports that are not tanker bases.
+    unknown = rng.random(n) < 0.05
+    airports[unknown] = "ZZZZ"
+    return pd.DataFrame(
+        {
+            "Tanker Number": [f"N{i:05d}T" for i in range(n)],
+            "Aircraft Type": rng.choice(["C-130", "BAE-146", "DC-10", "MD87"], n),
+            "Airport": airports,
+        }
+    )
+
+
+# --------------------------
+# Original app.py implementations
+# --------------------------
+def legacy_distance_pass(bases):
+    from geopy.distance import geodesic
+
+    return bases.apply(
+        lambda row: geodesic(FIRE, (row["LAT"], row["LON"])).nautical, axis=1
+    )
+
+
+def legacy_resolve(tankers, bases):
+    def get_airport_coords(icao_code):
+        match = bases[bases["ICAO"] == icao_code]
+        if not match.empty:
+            return (match.iloc[0]["LAT"], match.iloc[0]["LON"])
+        return None
+
+    return tankers["Airport"].apply(get_airport_coords)
+
+
+def legacy_layer_prep(tankers, coords):
+    valid = tankers.copy()
+    valid["coords"] = coords
+    valid = valid.dropna(subset=["coords"])
+    valid["LAT"] = valid["coords"].apply(lambda x: x[0])
+    valid["LON"] = valid["coords"].apply(lambda x: x[1])
+    for frame in (valid, valid.copy()):
+        frame["offset_index"] = frame.groupby("Airport").cumcount()
+        frame["LAT_offset"] = frame["LAT"] + frame["offset_index"] * 0.01
+        frame["LON_offset"] = frame["LON"] + frame["offset_index"] * 0.01
+    return valid
+
+
+# --------------------------
+# Harness
+# --------------------------
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def cases(bases, tankers, legacy):
+    """Yield (benchmark, variant, callable, row operations)"""
+    n_bases, n_tankers = len(bases), len(tankers)
+    index = IcaoIndex.from_frame(bases)
+    tree = BaseTree(bases["LAT"], bases["LON"])
+    scored, resolved = score_tankers(tankers, index, FIRE)
+    placed = tanker_positions(scored, resolved)
+    closest = nearest_bases(bases, tree, FIRE, 3)
+    nearest_cache = NearestCache(tree)
+
+    yield "distance_pass", "vincenty", lambda: distances_nm(
+        FIRE, bases["LAT"], bases["LON"]
+    ), n_bases
+    yield "distance_pass", "haversine", lambda: distances_nm(
+        FIRE, bases["LAT"], bases["LON"], method="haversine"
+    ), n_bases
+    yield "resolve_airports", "icao_index", lambda: index.resolve(
+        tankers["Airport"]
+    ), n_tankers
+    yield "resolve_airports", "index_build", lambda: IcaoIndex.from_frame(
+        bases
+    ), n_bases
+    yield "nearest_bases", "distance_pass_nsmallest", lambda: pd.Series(
+        distances_nm(FIRE, bases["LAT"], bases["LON"])
+    ).nsmallest(3), n_bases
+    yield "nearest_bases", "base_tree", lambda: tree.nearest(FIRE, 3), n_bases
+    yield "nearest_bases", "quantized_cache", lambda: nearest_cache.nearest(
+        FIRE, 3
+    ), n_bases
+    yield "nearest_bases", "tree_build", lambda: BaseTree(
+        bases["LAT"], bases["LON"]
+    ), n_bases
+    yield "layer_prep", "tanker_positions", lambda: tanker_positions(
+        scored, resolved
+    ), n_tankers
+    yield "layer_prep", "base_labels", lambda: base_labels(closest), 3
+    frames = layer_frames(FIRE, closest, placed)
+    yield "layer_prep", "label_layout", lambda: place_labels(frames), n_tankers
+    yield "layer_prep", "route_arcs", lambda: route_arcs(placed), n_tankers
+    layout = LabelPlacer().layout(frames)
+    yield "layer_prep", "deck_layers", lambda: deck_layers(frames, layout), n_tankers
+    deck = deck_layers(frames, layout)
+    yield "deck_json", "pydeck", lambda: deck_json(deck), n_tankers
+
+    if legacy:
+        if n_bases <= LEGACY_BUDGET // 20:
+            yield "distance_pass", "legacy_geopy_apply", lambda: legacy_distance_pass(
+                bases
+            ), n_bases
+        if n_bases * n_tankers <= LEGACY_BUDGET * 50:
+            coords = legacy_resolve(tankers, bases)
+            yield "resolve_airports", "legacy_mask_scan", lambda: legacy_resolve(
+                tankers, bases
+            ), n_bases * n_tankers
+            yield "layer_prep", "legacy_copies", lambda: legacy_layer_prep(
+                scored, coords
+            ), n_tankers
+
+
+def route_arcs(placed):
+    from tankerwatch.deck import route_paths
+
+    fire = [[FIRE[1], FIRE[0]]] * len(placed)
+    return route_paths(fire, placed[["LON", "LAT"]].to_numpy())
+
+
+def deck_layers(frames, layout):
+    from tankerwatch.deck import build_deck, build_layers
+
+    return build_deck(FIRE, build_layers(frames, layout), mapbox_api_key=None)
+
+
+def deck_json(deck):
+    """Serialize ``deck`` afresh; FrozenDeck would otherwise return its cached JSON"""
+    deck._json = None
+    return deck.to_json()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scenarios, repeats, legacy):
+    meta = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    results = []
+    for scenario in scenarios:
+        n_bases, n_tankers = SCENARIOS[scenario]
+        bases = make_bases(n_bases)
+        tankers = make_tankers(n_tankers, bases)
+        for benchmark, variant, fn, rows in cases(bases, tankers, legacy):
+            fn()  # warm-up
+            samples = timed(fn, repeats)
+            record = {
+                "benchmark": benchmark,
+                "variant": variant,
+                "scenario": scenario,
+                "n_bases": n_bases,
+                "n_tankers": n_tankers,
+                "rows": rows,
+                "repeats": repeats,
+                "min_s": min(samples),
+                "median_s": statistics.median(samples),
+                "mean_s": statistics.fmean(samples),
+            }
+            results.append(record)
+            print(
+                f"{scenario:>24} {benchmark:<17} {variant:<24} "
+                f"{record['median_s'] * 1e3:10.3f} ms",
+                file=sys.stderr,
+            )
+    return {"meta": meta, "results": results}
+
+
+def compare(before_path, after_path, threshold):
+    """Print median ratios and return True when nothing regressed"""
+
+    def keyed(path):
+        with open(path) as f:
+            report = json.load(f)
+        return {
+            (r["benchmark"], r["variant"], r["scenario"]): r for r in report["results"]
+        }
+
+    before, after = keyed(before_path), keyed(after_path)
+    ok = True
+    for key in sorted(before.keys() & after.keys()):
+        ratio = after[key]["median_s"] / before[key]["median_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, ok = "  REGRESSION", False
+        print(f"{key[2]:>24} {key[0]:<17} {key[1]:<20} x{ratio:6.2f}{flag}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="dataset size to run (repeatable; default: all)",
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--legacy", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown reported as a regression (default 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        sys.exit(0 if compare(*args.compare, args.threshold) else 1)
+
+    report = run(args.scenario or list(SCENARIOS), args.repeats, args.legacy)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
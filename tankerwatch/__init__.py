@@ -0,0 +1,25 @@
+"""Headless computation helpers for the TankerWatch dashboard.
+
+Nothing imported here depends on Streamlit or pydeck; map layers live in
+``tankerwatch.deck``.
+"""
+
+from tankerwatch.airports import AirportIndex
+from tankerwatch.core import Engine, nearest_bases, score_tankers, tanker_positions
+from tankerwatch.data import load_airport_data, load_airports, load_tanker_data
+from tankerwatch.geodesy import distance_nm, distances_nm, haversine_nm, vincenty_nm
+
+__all__ = [
+    "AirportIndex",
+    "Engine",
+    "distance_nm",
+    "distances_nm",
+    "haversine_nm",
+    "load_airport_data",
+    "load_airports",
+    "load_tanker_data",
+    "nearest_bases",
+    "score_tankers",
+    "tanker_positions",
+    "vincenty_nm",
+]
@@ -0,0 +1,3 @@
+from tankerwatch.cli import main
+
+main()
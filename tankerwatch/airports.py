@@ -0,0 +1,147 @@
+"""Filterable index over the worldwide airport table (``airports.csv``).
+
+Used to find reload and alternate airports near a fire, for example the
+nearest airports with at least two runways below 6,000 ft within 100 nm.
+Attribute filters are answered from masks built ahead of time and the
+spatial part from a ``BaseTree``, so a query only ranks nearby rows.
+"""
+
+import numpy as np
+
+from tankerwatch.data import read_only
+from tankerwatch.geodesy import distances_nm
+from tankerwatch.icao import IcaoIndex
+from tankerwatch.spatial import BaseTree
+
+# filter keyword -> (column, comparison)
+RANGE_FILTERS = {
+    "min_runways": ("# of Runways", ">="),
+    "min_elevation_ft": ("Elevation", ">="),
+    "max_elevation_ft": ("Elevation", "<="),
+    "min_ils": ("# ILS", ">="),
+    "min_gps": ("# GPS", ">="),
+}
+CATEGORY_FILTERS = {"country": "Country", "state": "State"}
+MASK_CACHE_SIZE = 256
+TREE_CANDIDATES = 1024  # beyond this many tree hits, rank the matches directly
+SNAP_NM = 1.0  # a base this close to an airport is taken to be that airport
+
+
+class AirportIndex:
+    """Airports plus per-attribute masks and a spatial tree.
+
+    Numeric columns are sorted once, so a threshold filter is a single
+    ``searchsorted`` plus a slice of the sort order, and every distinct
+    filter mask is built once and memoized. Missing values never pass a
+    filter; most airports have no runway, ILS or GPS counts.
+    """
+
+    def __init__(self, airports):
+        self.airports = read_only(airports.reset_index(drop=True))
+        self.tree = BaseTree(self.airports["LAT"], self.airports["LON"])
+        self.icao_index = IcaoIndex.from_frame(self.airports)
+        self._all = np.ones(len(self.airports), dtype=bool)
+        self._all.flags.writeable = False
+        self._sorted = {}
+        for column in {column for column, _ in RANGE_FILTERS.values()}:
+            values = self.airports[column].to_numpy(dtype=float)
+            present = np.flatnonzero(~np.isnan(values))
+            order = present[np.argsort(values[present], kind="stable")]
+            self._sorted[column] = (order, values[order])
+        self._categories = {
+            column: self.airports.groupby(column).indices
+            for column in CATEGORY_FILTERS.values()
+        }
+        self._masks = {}
+
+    def __len__(self):
+        return len(self.airports)
+
+    def _memo(self, key, rows):
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.zeros(len(self.airports), dtype=bool)
+            mask[rows()] = True
+            mask.flags.writeable = False
+            if len(self._masks) >= MASK_CACHE_SIZE:
+                self._masks.clear()
+            self._masks[key] = mask
+        return mask
+
+    def _range_rows(self, column, op, value):
+        order, values = self._sorted[column]
+        if op == ">=":
+            return order[np.searchsorted(values, value, side="left") :]
+        return order[: np.searchsorted(values, value, side="right")]
+
+    def mask(self, **filters):
+        """Read-only boolean row mask for the given filters (None: no filter)"""
+        combined = self._all
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name in RANGE_FILTERS:
+                column, op = RANGE_FILTERS[name]
+                value = float(value)
+                mask = self._memo(
+                    (column, op, value),
+                    lambda: self._range_rows(column, op, value),
+                )
+            elif name in CATEGORY_FILTERS:
+                column = CATEGORY_FILTERS[name]
+                mask = self._memo(
+                    (column, "==", value),
+                    lambda: self._categories[column].get(value, []),
+                )
+            else:
+                raise TypeError(f"unknown airport filter: {name!r}")
+            combined = combined & mask
+        return combined
+
+    def query(self, location, k=5, radius_nm=None, **filters):
+        """Return (positions, distances_nm) of the nearest matching airports.
+
+        With ``radius_nm`` only airports that close are returned and ``k``
+        may be None for all of them.
+        """
+        keep = self.mask(**filters)
+        positions = None
+        if radius_nm is not None:
+            positions, distances = self.tree.within(location, radius_nm)
+        else:
+            n = max(k, 16)
+            while n <= TREE_CANDIDATES:
+                positions, distances = self.tree.nearest(location, n)
+                if np.count_nonzero(keep[positions]) >= k or n >= len(self):
+                    break
+                positions, n = None, n * 4
+        if positions is None:
+            # Few matches close by: rank every matching airport instead.
+            rows = np.flatnonzero(keep)
+            distances = distances_nm(
+                location, self.tree.lats[rows], self.tree.lons[rows]
+            )
+            order = np.argsort(distances, kind="stable")
+            positions, distances = rows[order], distances[order]
+        hit = keep[positions]
+        return positions[hit][:k], distances[hit][:k]
+
+    def enrich(self, bases, snap_nm=SNAP_NM):
+        """Fill base elevation and runway counts from the airport table.
+
+        Bases are matched by ICAO code first; a base whose code is not in
+        the table takes the nearest airport within ``snap_nm``. Unmatched
+        bases and airports without the data keep NaN.
+        """
+        rows = self.icao_index.resolve(bases["ICAO"]).row
+        for i in np.flatnonzero(rows < 0):
+            location = (bases["LAT"].iat[i], bases["LON"].iat[i])
+            position, distance = self.tree.nearest(location, 1)
+            if len(distance) and distance[0] <= snap_nm:
+                rows[i] = position[0]
+
+        enriched = bases.copy()
+        for column in ("Elevation", "# of Runways"):
+            values = self.airports[column].to_numpy(dtype=float)
+            enriched[column] = np.append(values, np.nan)[rows]
+        return enriched
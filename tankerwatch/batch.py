@@ -0,0 +1,227 @@
+"""Streaming batch scoring of many fire locations.
+
+Fires are read in chunks from CSV or JSONL, scored against the nearest
+bases and tankers, and appended to CSV, JSONL or Parquet as each chunk
+finishes, so memory stays bounded by the chunk size.
+"""
+
+import collections
+import concurrent.futures
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tankerwatch.core import Engine
+from tankerwatch.data import AIRPORT_FILE, TANKER_FILE
+from tankerwatch.eta import PerformanceTable, eta_minutes
+from tankerwatch.geodesy import vincenty_nm
+
+LAT_NAMES = ("lat", "latitude", "LAT", "Latitude")
+LON_NAMES = ("lon", "lng", "longitude", "LON", "Longitude")
+ID_NAMES = ("fire_id", "id", "name", "ID", "Name")
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+def _pick(columns, names, what):
+    for name in names:
+        if name in columns:
+            return name
+    if what is None:
+        return None
+    raise KeyError(f"No {what} column; expected one of {list(names)}")
+
+
+def score_fires(engine, lats, lons, k=3, n_tankers=3, eta=False):
+    """Nearest ``k`` bases and ``n_tankers`` tankers for each fire.
+
+    Returns a wide DataFrame with one row per fire and ``base_<i>_*`` /
+    ``tanker_<i>_*`` columns, nearest first. Missing slots are empty. With
+    ``eta`` each tanker slot also gets ``tanker_<i>_eta_min``.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    out = {}
+
+    base_pos, base_nm = engine.base_tree.nearest_many(lats, lons, k)
+    codes = np.append(engine.bases["ICAO"].to_numpy(dtype=object), None)
+    for j in range(base_pos.shape[1]):
+        out[f"base_{j + 1}_icao"] = codes[base_pos[:, j]]
+        out[f"base_{j + 1}_nm"] = base_nm[:, j].round(1)
+
+    fleet = engine.placed_tankers
+    n_tankers = min(n_tankers, len(fleet))
+    if n_tankers:
+        # One (fires x tankers) distance matrix for the whole chunk.
+        matrix = vincenty_nm(
+            lats[:, None],
+            lons[:, None],
+            fleet["LAT"].to_numpy(),
+            fleet["LON"].to_numpy(),
+        )
+        nearest = np.argsort(matrix, axis=1, kind="stable")[:, :n_tankers]
+        # Fires without coordinates get no tanker; index the None sentinel.
+        nearest[np.isnan(lats) | np.isnan(lons)] = -1
+        tails = np.append(fleet["Tanker Number"].to_numpy(dtype=object), None)
+        airports = np.append(fleet["Airport"].to_numpy(dtype=object), None)
+        nm = np.column_stack([matrix, np.full(len(lats), np.nan)])
+        if eta:
+            performance = PerformanceTable().resolve(fleet["Aircraft Type"])
+            cruise = np.append(performance.cruise_kt, np.nan)
+            spinup = np.append(performance.spinup_min, np.nan)
+        for j in range(n_tankers):
+            slot = nearest[:, j]
+            slot_nm = np.take_along_axis(nm, slot[:, None], axis=1)[:, 0]
+            out[f"tanker_{j + 1}"] = tails[slot]
+            out[f"tanker_{j + 1}_airport"] = airports[slot]
+            out[f"tanker_{j + 1}_nm"] = slot_nm.round(1)
+            if eta:
+                out[f"tanker_{j + 1}_eta_min"] = eta_minutes(
+                    slot_nm, cruise[slot], spinup[slot]
+                ).round(1)
+    return pd.DataFrame(out)
+
+
+def read_fires(path, chunk_size=10_000):
+    """Yield DataFrames of fires from a CSV or JSONL file"""
+    path = Path(path)
+    if path.suffix.lower() in (".jsonl", ".ndjson", ".json"):
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ResultWriter:
+    """Append scored chunks to a CSV, JSONL or Parquet file"""
+
+    def __init__(self, path, fmt=None):
+        self.path = Path(path)
+        self.fmt = fmt or self.path.suffix.lower().lstrip(".")
+        if self.fmt == "ndjson":
+            self.fmt = "jsonl"
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unknown output format {self.fmt!r}; expected {FORMATS}")
+        self._parquet = None
+        self._started = False
+
+    def write(self, df):
+        if self.fmt == "csv":
+            df.to_csv(
+                self.path,
+                mode="a" if self._started else "w",
+                header=not self._started,
+                index=False,
+            )
+        elif self.fmt == "jsonl":
+            with open(self.path, "a" if self._started else "w") as f:
+                df.to_json(f, orient="records", lines=True)
+        else:
+            self._write_parquet(df)
+        self._started = True
+
+    def _write_parquet(self, df):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow") from None
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.path, table.schema)
+        self._parquet.write_table(table.cast(self._parquet.schema))
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        elif not self._started:
+            self.path.write_text("")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_chunk(engine, chunk, offset, k, n_tankers):
+    lat_col = _pick(chunk.columns, LAT_NAMES, "latitude")
+    lon_col = _pick(chunk.columns, LON_NAMES, "longitude")
+    id_col = _pick(chunk.columns, ID_NAMES, None)
+    ids = chunk[id_col].to_numpy() if id_col else np.arange(offset, offset + len(chunk))
+    scored = score_fires(engine, chunk[lat_col], chunk[lon_col], k, n_tankers)
+    scored.insert(0, "fire_id", ids)
+    scored.insert(1, "lat", chunk[lat_col].to_numpy())
+    scored.insert(2, "lon", chunk[lon_col].to_numpy())
+    return scored
+
+
+_worker_engine = None
+
+
+def _init_worker(airport_path, tanker_path):
+    global _worker_engine
+    # Scoring reads bases, their tree and the placed tankers only; skip the
+    # worldwide airport table and its index.
+    _worker_engine = Engine.from_files(airport_path, tanker_path, airports_path=None)
+
+
+def _score_in_worker(chunk, offset, k, n_tankers):
+    return score_chunk(_worker_engine, chunk, offset, k, n_tankers)
+
+
+def score_file(
+    source,
+    target,
+    engine=None,
+    k=3,
+    n_tankers=3,
+    chunk_size=10_000,
+    workers=1,
+    fmt=None,
+    airport_path=AIRPORT_FILE,
+    tanker_path=TANKER_FILE,
+):
+    """Score every fire in ``source`` into ``target``.
+
+    With ``workers > 1`` chunks are scored in a process pool; at most two
+    chunks per worker are in flight and results are written in input order.
+    Returns ``(fires, seconds)``.
+    """
+    started = time.perf_counter()
+    fires = 0
+
+    with ResultWriter(target, fmt) as writer:
+        if workers <= 1:
+            engine = engine or Engine.from_files(
+                airport_path, tanker_path, airports_path=None
+            )
+            for chunk in read_fires(source, chunk_size):
+                writer.write(score_chunk(engine, chunk, fires, k, n_tankers))
+                fires += len(chunk)
+        else:
+            if engine is None:
+                # Build snapshots up front so workers only memory-map them.
+                Engine.from_files(airport_path, tanker_path, airports_path=None)
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(airport_path, tanker_path),
+            ) as pool:
+                pending = collections.deque()
+                for chunk in read_fires(source, chunk_size):
+                    pending.append(
+                        pool.submit(_score_in_worker, chunk, fires, k, n_tankers)
+                    )
+                    fires += len(chunk)
+                    if len(pending) >= 2 * workers:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+
+    return fires, time.perf_counter() - started
+
+
+def default_workers():
+    return os.cpu_count() or 1
@@ -0,0 +1,103 @@
+"""Process-wide cache of nearest-base candidates keyed by grid cell.
+
+Fire locations are snapped to a lat/lon grid. For each (cell, k, base-data
+version) the cache stores every base that can be among the k nearest for
+*any* point in the cell: if ``c`` is the cell centre, ``r`` the distance from
+the centre to the farthest corner and ``d_k`` the k-th nearest distance from
+``c``, the triangle inequality bounds every point's top k to within
+``d_k + 2r`` of ``c``. Queries rank those few candidates with the exact
+geodesic, so cached answers are identical to uncached ones.
+"""
+
+import collections
+import math
+import threading
+
+import numpy as np
+
+from tankerwatch.geodesy import distances_nm
+
+
+class NearestCache:
+    """LRU of nearest-base candidate sets with hit/miss counters.
+
+    ``tree`` is a ``spatial.BaseTree``; ``version`` identifies the base data
+    so answers from an older table are never served.
+    """
+
+    def __init__(self, tree, version=None, precision_deg=0.05, maxsize=4096):
+        if precision_deg <= 0:
+            raise ValueError("precision_deg must be positive")
+        self.tree = tree
+        self.version = version
+        self.precision_deg = precision_deg
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def cell(self, location):
+        lat, lon = location
+        return (
+            math.floor(lat / self.precision_deg),
+            math.floor(((lon + 180) % 360 - 180) / self.precision_deg),
+        )
+
+    def _candidates(self, cell, k):
+        step = self.precision_deg
+        south, west = cell[0] * step, cell[1] * step
+        corner_lats = np.clip([south, south, south + step, south + step], -90, 90)
+        corner_lons = np.array([west, west + step, west, west + step])
+        centre = (min(max(south + step / 2, -90), 90), west + step / 2)
+        radius = distances_nm(centre, corner_lats, corner_lons).max()
+
+        _, nearest = self.tree.nearest(centre, k)
+        if not len(nearest):
+            return np.empty(0, dtype=int)
+        positions, _ = self.tree.within(centre, nearest[-1] + 2 * radius + 1e-6)
+        return positions
+
+    def nearest(self, location, k=3):
+        """Return (positions, distances_nm) of the k nearest bases, nearest first"""
+        if not all(map(math.isfinite, location)):
+            return self.tree.nearest(location, k)
+        key = (self.cell(location), k, self.version)
+        with self._lock:
+            candidates = self._entries.get(key)
+            if candidates is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if candidates is None:
+            candidates = self._candidates(key[0], k)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = candidates
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        exact = distances_nm(
+            location, self.tree.lats[candidates], self.tree.lons[candidates]
+        )
+        order = np.argsort(exact, kind="stable")[:k]
+        return candidates[order], exact[order]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
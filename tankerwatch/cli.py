@@ -0,0 +1,193 @@
+"""Command-line entry points: ``python -m tankerwatch <command>``."""
+
+import argparse
+import sys
+
+from tankerwatch.data import AIRPORT_FILE, TANKER_FILE
+
+
+def score(args):
+    from tankerwatch.batch import default_workers, score_file
+
+    workers = default_workers() if args.workers == 0 else args.workers
+    fires, seconds = score_file(
+        args.source,
+        args.target,
+        k=args.k,
+        n_tankers=args.tankers,
+        chunk_size=args.chunk_size,
+        workers=workers,
+        fmt=args.format,
+        airport_path=args.airports,
+        tanker_path=args.tanker_file,
+    )
+    rate = fires / seconds if seconds else float("inf")
+    print(
+        f"Scored {fires} fires in {seconds:.2f}s ({rate:,.0f} fires/s, "
+        f"{workers} worker{'s' if workers != 1 else ''})",
+        file=sys.stderr,
+    )
+
+
+def replay(args):
+    import socket
+    import time
+
+    host, _, port = args.target.rpartition(":")
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    interval = 1 / args.rate if args.rate else 0
+    sent = 0
+    with open(args.source, "rb") as f:
+        for line in f:
+            if line.strip():
+                sock.sendto(line.rstrip(b"\n"), (host, int(port)))
+                sent += 1
+                time.sleep(interval)
+    print(f"Sent {sent} reports to {args.target}", file=sys.stderr)
+
+
+def serve(args):
+    import json
+
+    from tankerwatch.core import Engine
+    from tankerwatch.service import QueryServer
+
+    engine = Engine.from_files(args.airports, args.tanker_file)
+    server = QueryServer(
+        (args.host, args.port),
+        engine,
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+        workers=args.workers,
+        airport_path=args.airports,
+        tanker_path=args.tanker_file,
+    )
+    print(f"Serving on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats()), file=sys.stderr)
+
+
+def _warm_up(mapbox_api_key=None, coverage=True):
+    from tankerwatch import warmup
+    from tankerwatch.data import DEFAULT_LOCATION, LOCATION_PRESETS
+
+    return warmup.warm_up(
+        locations=[DEFAULT_LOCATION, *LOCATION_PRESETS.values()],
+        coverage=coverage,
+        mapbox_api_key=mapbox_api_key,
+    )
+
+
+def warmup(args):
+    import json
+
+    timings = _warm_up(coverage=not args.no_coverage)
+    print(json.dumps(timings.as_dict(), indent=2))
+
+
+def app(args):
+    import streamlit as st
+    from streamlit.web import cli as streamlit_cli
+
+    from tankerwatch.assets import ASSET_DIR
+
+    try:
+        mapbox_api_key = st.secrets["mapbox"]["api_key"]
+    except (FileNotFoundError, KeyError):
+        mapbox_api_key = None
+    timings = _warm_up(mapbox_api_key, coverage=not args.no_coverage)
+    print(f"Warmed up in {timings.total_ms:.0f} ms", file=sys.stderr)
+    # Same process, so the app finds the warmed resources and caches.
+    sys.argv = ["streamlit", "run", str(ASSET_DIR / "app.py"), *args.streamlit_args]
+    sys.exit(streamlit_cli.main())
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="tankerwatch")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser(
+        "score", help="score fire locations from a CSV or JSONL file"
+    )
+    p.add_argument("source", help="CSV or JSONL file with lat/lon columns")
+    p.add_argument("target", help="output file (.csv, .jsonl or .parquet)")
+    p.add_argument("-k", type=int, default=3, help="nearest bases per fire")
+    p.add_argument("--tankers", type=int, default=3, help="nearest tankers per fire")
+    p.add_argument("--chunk-size", type=int, default=10_000)
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes; 0 uses every core",
+    )
+    p.add_argument("--format", choices=["csv", "jsonl", "parquet"])
+    p.add_argument("--airports", default=AIRPORT_FILE, help="tanker base workbook")
+    p.add_argument(
+        "--tanker-file", default=TANKER_FILE, help="tanker location workbook"
+    )
+    p.set_defaults(func=score)
+
+    p = commands.add_parser(
+        "replay", help="send JSONL position reports to a UDP live feed"
+    )
+    p.add_argument("source", help="JSONL file of position reports")
+    p.add_argument("target", help="host:port the dashboard feed listens on")
+    p.add_argument("--rate", type=float, default=50, help="reports per second")
+    p.set_defaults(func=replay)
+
+    p = commands.add_parser(
+        "serve", help="answer nearest base/tanker queries over local HTTP"
+    )
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    p.add_argument("--max-batch", type=int, default=4096, help="fires per micro-batch")
+    p.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=2.0,
+        help="how long a batch waits for more requests",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="worker processes for large batches; 0 scores in the server",
+    )
+    p.add_argument("--airports", default=AIRPORT_FILE, help="tanker base workbook")
+    p.add_argument(
+        "--tanker-file", default=TANKER_FILE, help="tanker location workbook"
+    )
+    p.set_defaults(func=serve)
+
+    p = commands.add_parser(
+        "warmup", help="build data snapshots and caches, and report their timings"
+    )
+    p.add_argument("--no-coverage", action="store_true", help="skip the coverage grid")
+    p.set_defaults(func=warmup)
+
+    p = commands.add_parser(
+        "app", help="warm up, then start the dashboard in the same process"
+    )
+    p.add_argument("--no-coverage", action="store_true", help="skip the coverage grid")
+    p.add_argument(
+        "streamlit_args",
+        nargs=argparse.REMAINDER,
+        help="passed on to streamlit run (e.g. --server.port 8501)",
+    )
+    p.set_defaults(func=app)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
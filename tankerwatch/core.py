@@ -0,0 +1,189 @@
+"""Fire-dependent computations over the base and tanker tables.
+
+Everything here works on plain DataFrames and NumPy arrays and has no
+Streamlit or pydeck dependency, so it can run in batch jobs and services.
+"""
+
+import hashlib
+from typing import NamedTuple
+
+import pandas as pd
+
+from tankerwatch.airports import AirportIndex
+from tankerwatch.cache import NearestCache
+from tankerwatch.data import AIRPORT_FILE, AIRPORTS_FILE, TANKER_FILE
+from tankerwatch.data import load_airport_data, load_airports, load_tanker_data
+from tankerwatch.data import read_only
+from tankerwatch.geodesy import distances_nm, great_circle_points
+from tankerwatch.icao import IcaoIndex
+from tankerwatch.spatial import BaseTree
+
+DISTANCE_COLUMN = "Distance to Fire (nm)"
+
+
+def nearest_bases(bases, tree, location, k=3):
+    """The k bases closest to ``location`` with their rounded distances"""
+    positions, distances = tree.nearest(location, k)
+    return bases.iloc[positions].assign(**{DISTANCE_COLUMN: distances.round(1)})
+
+
+def alternate_airports(index, location, k=5, radius_nm=None, **filters):
+    """Nearest airports matching ``filters`` (see ``AirportIndex.mask``)"""
+    positions, distances = index.query(location, k, radius_nm, **filters)
+    return index.airports.iloc[positions].assign(
+        **{DISTANCE_COLUMN: distances.round(1)}
+    )
+
+
+def score_tankers(tankers, index, location):
+    """Add the distance to ``location`` for every tanker.
+
+    Returns the scored copy of ``tankers`` and the ``Resolved`` coordinates
+    of their airports, aligned row for row.
+    """
+    resolved = index.resolve(tankers["Airport"])
+    scored = tankers.assign(
+        **{DISTANCE_COLUMN: distances_nm(location, resolved.lat, resolved.lon)}
+    )
+    return scored, resolved
+
+
+def tanker_positions(tankers, resolved):
+    """Tankers at known bases with their airport coordinates and map labels.
+
+    Tankers sharing an airport share its coordinates; ``labels.LabelPlacer``
+    spreads them out when the map is drawn.
+    """
+    placed = tankers.assign(LAT=resolved.lat, LON=resolved.lon)
+    placed = placed.dropna(subset=["LAT", "LON"])
+    # Rows added in the editor may lack either part; label what is there.
+    tail = placed["Tanker Number"].astype("str").fillna("")
+    airport = placed["Airport"].astype("str").fillna("")
+    return placed.assign(label_text=tail + "\n" + airport)
+
+
+def base_labels(bases):
+    """Bases with a multi-line ICAO / name / state label"""
+    return bases.assign(
+        label_text=bases["ICAO"] + "\n" + bases["Name"] + "\n" + bases["State"]
+    )
+
+
+def route_lines(location, bases):
+    """Line segments from the fire to each base, as [lon, lat] pairs"""
+    lat, lon = location
+    return pd.DataFrame(
+        {
+            "start": [[lon, lat]] * len(bases),
+            "end": [[b_lon, b_lat] for b_lat, b_lon in zip(bases["LAT"], bases["LON"])],
+        }
+    )
+
+
+def distance_labels(location, bases):
+    """Distance labels at the great-circle midpoint between the fire and each base"""
+    lat, lon = location
+    mid_lats, mid_lons = great_circle_points(
+        lat, lon, bases["LAT"].to_numpy(), bases["LON"].to_numpy(), 0.5
+    )
+    return pd.DataFrame(
+        {
+            "lat": mid_lats,
+            "lon": mid_lons,
+            "text": [f"{d:.0f}nm" for d in bases[DISTANCE_COLUMN]],
+        }
+    )
+
+
+class LayerFrames(NamedTuple):
+    """Column-minimal map data, one frame per entity type.
+
+    Each frame is shared by every layer that draws that entity (icon,
+    label shadow and label text) instead of being copied per layer.
+    """
+
+    fire: pd.DataFrame  # lon, lat, icon
+    bases: pd.DataFrame  # LON, LAT, label_text, icon
+    tankers: pd.DataFrame  # LON, LAT, label_text, icon (placed by ``labels``)
+    routes: pd.DataFrame  # start, end
+    distances: pd.DataFrame  # lon, lat, text
+
+
+def layer_frames(location, closest_bases, tankers):
+    """Build every map frame in one pass from the scored tables.
+
+    ``tankers`` is the output of ``tanker_positions`` (or ``FleetState.placed``).
+    """
+    lat, lon = location
+    return LayerFrames(
+        fire=pd.DataFrame({"lon": [lon], "lat": [lat], "icon": ["flame"]}),
+        bases=base_labels(closest_bases)[["LON", "LAT", "label_text"]].assign(
+            icon="location"
+        ),
+        tankers=tankers[["LON", "LAT", "label_text"]].assign(icon="plane"),
+        routes=route_lines(location, closest_bases),
+        distances=distance_labels(location, closest_bases),
+    )
+
+
+def frame_digest(*frames):
+    """Content hash of one or more DataFrames, for use as a cache key"""
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(",".join(map(str, frame.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy())
+    return digest.hexdigest()
+
+
+class Engine:
+    """Reference data plus the indexes built over it.
+
+    Build it once per process and call its methods for each fire location.
+    The tables are read-only and shared by every caller; per-fire results
+    are small new frames built from row positions into them.
+    """
+
+    def __init__(
+        self, bases, tankers, airports=None, cache_precision_deg=0.05, cache_size=4096
+    ):
+        self.airport_index = None
+        if airports is not None:
+            self.airport_index = AirportIndex(airports)
+            bases = self.airport_index.enrich(bases)
+        self.bases = read_only(bases)
+        self.tankers = read_only(tankers)
+        self.icao_index = IcaoIndex.from_frame(bases)
+        self.base_tree = BaseTree(bases["LAT"], bases["LON"])
+        self.nearest_cache = NearestCache(
+            self.base_tree,
+            version=frame_digest(bases[["ICAO", "LAT", "LON"]]),
+            precision_deg=cache_precision_deg,
+            maxsize=cache_size,
+        )
+        self.placed_tankers = read_only(
+            tanker_positions(tankers, self.icao_index.resolve(tankers["Airport"]))
+        )
+
+    @classmethod
+    def from_files(
+        cls,
+        airport_path=AIRPORT_FILE,
+        tanker_path=TANKER_FILE,
+        airports_path=AIRPORTS_FILE,
+    ):
+        return cls(
+            load_airport_data(airport_path),
+            load_tanker_data(tanker_path),
+            load_airports(airports_path) if airports_path is not None else None,
+        )
+
+    def nearest_bases(self, location, k=3):
+        return nearest_bases(self.bases, self.nearest_cache, location, k)
+
+    def alternate_airports(self, location, k=5, radius_nm=None, **filters):
+        return alternate_airports(self.airport_index, location, k, radius_nm, **filters)
+
+    def score_tankers(self, location, tankers=None):
+        return score_tankers(
+            self.tankers if tankers is None else tankers, self.icao_index, location
+        )
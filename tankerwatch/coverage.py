@@ -0,0 +1,261 @@
+"""Regional coverage: time to the first tanker over a lat/lon grid.
+
+For every cell centre of a grid over the western US, ``CoverageGrid`` keeps
+the distance to the nearest base, the ETA of the soonest tanker and the
+distance to the nearest tanker. Tankers parked at the same airport with the
+same performance share one *source* column.
+
+``update`` diffs the placed tankers against the sources it already holds.
+An added source only lowers the cells where it beats the current best, and
+a removed source re-scans only the cells it was best for, so moving one
+tanker leaves the rest of the raster alone. With ``workers`` above one the
+first build is split into cell chunks across a spawned process pool.
+Finished rasters are kept per tanker-state hash, so switching back to an
+earlier state costs nothing.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import math
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+
+from tankerwatch.assets import encode_png
+from tankerwatch.core import frame_digest
+from tankerwatch.eta import PerformanceTable, eta_minutes
+from tankerwatch.geodesy import vincenty_nm
+
+WESTERN_US = (31.0, 49.0, -125.0, -102.0)  # south, north, west, east
+COVERAGE_STEP_DEG = float(os.environ.get("TANKERWATCH_COVERAGE_STEP", 0.1))
+COVERAGE_CACHE_SIZE = 16  # rasters kept per tanker-state hash
+POOL_MIN_PAIRS = 1_000_000  # cells x sources before a build uses the pool
+
+# metric -> (label, unit, value drawn in the darkest colour, colour band width)
+COVERAGE_METRICS = {
+    "tanker_eta": ("Soonest tanker ETA", "min", 120, 10),
+    "tanker_nm": ("Nearest tanker distance", "NM", 300, 25),
+    "base_nm": ("Nearest base distance", "NM", 150, 15),
+}
+# Fraction of the metric's range -> RGBA, green (covered) to dark red
+COLOR_STOPS = (0.0, 0.25, 0.5, 0.75, 1.0)
+COLOR_RAMP = np.array(
+    [
+        [26, 152, 80, 150],
+        [166, 217, 106, 150],
+        [254, 224, 139, 160],
+        [244, 109, 67, 170],
+        [165, 0, 38, 180],
+    ],
+    dtype=float,
+)
+
+
+def _source_nm(cell_lats, cell_lons, lats, lons):
+    """(cells, sources) distance matrix in NM"""
+    return vincenty_nm(
+        cell_lats[:, None], cell_lons[:, None], lats[None, :], lons[None, :]
+    ).astype(np.float32)
+
+
+def source_distances(cell_lats, cell_lons, lats, lons, workers=1):
+    """Distances from every cell to every source, chunked over a pool if large"""
+    if workers <= 1 or len(cell_lats) * len(lats) < POOL_MIN_PAIRS:
+        return _source_nm(cell_lats, cell_lons, lats, lons)
+    chunks = np.array_split(np.arange(len(cell_lats)), 4 * workers)
+    # Spawn, not fork: the grid is built from threaded servers (Streamlit,
+    # the warm-up thread), and forking a threaded process is unsafe.
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        parts = pool.map(
+            _source_nm,
+            [cell_lats[chunk] for chunk in chunks],
+            [cell_lons[chunk] for chunk in chunks],
+            itertools.repeat(lats),
+            itertools.repeat(lons),
+        )
+        return np.vstack(list(parts))
+
+
+def _mercator_y(lat):
+    return np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+
+
+class Coverage:
+    """One finished raster; arrays are (rows, cols) with row 0 in the south"""
+
+    def __init__(self, grid, digest, tanker_eta, tanker_nm):
+        self.bounds = grid.bounds
+        self.step = grid.step
+        self.shape = grid.shape
+        self.digest = digest
+        self.values = {
+            "tanker_eta": tanker_eta.reshape(grid.shape),
+            "tanker_nm": tanker_nm.reshape(grid.shape),
+            "base_nm": grid.base_nm.reshape(grid.shape),
+        }
+        self._images = {}
+
+    def image(self, metric="tanker_eta", rows_per_cell=2):
+        """PNG of ``metric`` whose rows are spaced for a Web Mercator map.
+
+        Map layers stretch an image linearly between its bounds in Mercator
+        space, so each output row samples the grid row at its own latitude.
+        Values are drawn in flat bands, which read like contours and keep
+        the PNG to a few KB.
+        """
+        if metric not in self._images:
+            south, north, _, _ = self.bounds
+            values = self.values[metric]
+            height = self.shape[0] * rows_per_cell
+            y = np.linspace(_mercator_y(north), _mercator_y(south), height + 1)
+            y = (y[:-1] + y[1:]) / 2
+            lat = np.degrees(2 * np.arctan(np.exp(y)) - np.pi / 2)
+            rows = np.clip(((lat - south) / self.step).astype(int), 0, len(values) - 1)
+            _, _, top, band = COVERAGE_METRICS[metric]
+            scaled = np.floor(values[rows] / band) * band / top
+            rgba = np.empty(scaled.shape + (4,), dtype=np.uint8)
+            for channel in range(4):
+                rgba[..., channel] = np.interp(
+                    scaled, COLOR_STOPS, COLOR_RAMP[:, channel]
+                )
+            rgba[~np.isfinite(scaled)] = 0
+            self._images[metric] = encode_png(rgba)
+        return self._images[metric]
+
+
+class CoverageGrid:
+    """Nearest-base, soonest-tanker and nearest-tanker rasters, updated as tankers move.
+
+    Safe to share between threads; one instance per process is enough.
+    ``workers`` above one builds the first raster on a process pool.
+    """
+
+    def __init__(
+        self,
+        tree,
+        bounds=WESTERN_US,
+        step_deg=COVERAGE_STEP_DEG,
+        performance=None,
+        workers=1,
+        cache_size=COVERAGE_CACHE_SIZE,
+    ):
+        south, north, west, east = bounds
+        rows = math.ceil((north - south) / step_deg - 1e-9)
+        cols = math.ceil((east - west) / step_deg - 1e-9)
+        # Bounds snap outward to whole cells so the image lines up with the grid.
+        self.bounds = (south, south + rows * step_deg, west, west + cols * step_deg)
+        self.step = step_deg
+        self.shape = (rows, cols)
+        lats = south + (np.arange(rows) + 0.5) * step_deg
+        lons = west + (np.arange(cols) + 0.5) * step_deg
+        self.lats = np.repeat(lats, cols)
+        self.lons = np.tile(lons, rows)
+        self.performance = performance or PerformanceTable()
+        self.workers = workers
+        self.cache_size = cache_size
+
+        self.base_nm = tree.nearest_many(self.lats, self.lons, 1)[1][:, 0].astype(
+            np.float32
+        )
+
+        n = len(self.lats)
+        self.best_eta = np.full(n, np.inf, dtype=np.float32)
+        self.eta_source = np.full(n, -1, dtype=np.int32)
+        self.best_nm = np.full(n, np.inf, dtype=np.float32)
+        self.nm_source = np.full(n, -1, dtype=np.int32)
+        self._sources = {}  # (lat, lon, cruise, spinup) -> source id
+        self._nm = {}  # source id -> distance from every cell
+        self._eta = {}  # source id -> ETA from every cell
+        self._ids = itertools.count()
+        self._rasters = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def coverage(self, placed, stats=None):
+        """The raster for ``placed`` tankers (``LAT``, ``LON``, ``Aircraft Type``).
+
+        ``stats``, a dict owned by the caller, receives ``cache_hit`` and the
+        number of ``cells`` this call changed.
+        """
+        stats = {} if stats is None else stats
+        digest = frame_digest(placed[["LAT", "LON", "Aircraft Type"]])
+        with self._lock:
+            raster = self._rasters.get(digest)
+            if raster is not None:
+                self._rasters.move_to_end(digest)
+                stats.update(cache_hit=True, cells=0)
+                return raster
+            stats.update(cache_hit=False, cells=len(self.update(placed)))
+            raster = Coverage(self, digest, self.best_eta.copy(), self.best_nm.copy())
+            self._rasters[digest] = raster
+            while len(self._rasters) > self.cache_size:
+                self._rasters.popitem(last=False)
+            return raster
+
+    def update(self, placed):
+        """Bring the raster in line with ``placed``; returns the cells that changed"""
+        performance = self.performance.resolve(placed["Aircraft Type"])
+        wanted = set(
+            zip(
+                placed["LAT"].to_numpy(float),
+                placed["LON"].to_numpy(float),
+                performance.cruise_kt,
+                performance.spinup_min,
+            )
+        )
+        removed = [self._sources.pop(key) for key in set(self._sources) - wanted]
+        added = [key for key in wanted if key not in self._sources]
+        changed = np.zeros(len(self.lats), dtype=bool)
+
+        for source in removed:
+            del self._nm[source], self._eta[source]
+        if removed:
+            # Only the cells a removed source was best for need a new best.
+            for best, best_source, values in self._rasters_by_metric():
+                stale = np.flatnonzero(np.isin(best_source, removed))
+                self._rescan(stale, best, best_source, values)
+                changed[stale] = True
+
+        if added:
+            source_lats, source_lons, cruise, spinup = map(np.array, zip(*added))
+            workers = self.workers if not self._eta else 1
+            nm = source_distances(
+                self.lats, self.lons, source_lats, source_lons, workers
+            )
+            eta = eta_minutes(nm, cruise, spinup).astype(np.float32)
+            for j, key in enumerate(added):
+                source = next(self._ids)
+                self._sources[key] = source
+                self._nm[source], self._eta[source] = nm[:, j], eta[:, j]
+                for best, best_source, values in (
+                    (self.best_eta, self.eta_source, eta[:, j]),
+                    (self.best_nm, self.nm_source, nm[:, j]),
+                ):
+                    better = values < best
+                    best[better] = values[better]
+                    best_source[better] = source
+                    changed |= better
+
+        return np.flatnonzero(changed)
+
+    def _rasters_by_metric(self):
+        """(best values, best source, per-source values) for ETA and distance"""
+        return (
+            (self.best_eta, self.eta_source, self._eta),
+            (self.best_nm, self.nm_source, self._nm),
+        )
+
+    def _rescan(self, cells, best, best_source, values):
+        if not values:
+            best[cells] = np.inf
+            best_source[cells] = -1
+            return
+        sources = np.fromiter(values, dtype=np.int32)
+        candidates = np.column_stack([values[source][cells] for source in sources])
+        nearest = candidates.argmin(axis=1)
+        best[cells] = candidates[np.arange(len(cells)), nearest]
+        best_source[cells] = sources[nearest]
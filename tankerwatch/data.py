@@ -0,0 +1,215 @@
+"""Loaders for the tanker base, tanker location and airport reference files."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from tankerwatch.assets import ASSET_DIR
+from tankerwatch.icao import normalize_codes
+from tankerwatch.snapshots import load_snapshot
+
+AIRPORT_FILE = ASSET_DIR / "AirTankerBases_2025_with_ICAO_codes.xlsx"
+TANKER_FILE = ASSET_DIR / "eod_loc_July7.xlsx"
+AIRPORTS_FILE = ASSET_DIR / "airports.csv"
+
+BASE_COLUMNS = [
+    "Name",
+    "ICAO",
+    "LAT",
+    "LON",
+    "Elevation",
+    "# of Runways",
+    "Region",
+    "County",
+    "State",
+]
+TANKER_COLUMNS = ["Tanker Number", "Aircraft Type", "Airport"]
+EOD_ID_COLUMNS = ["TailNumber", "Type"]
+HEADER_DATE_FORMATS = ["%b %d, %Y", "%b %d %Y", "%B %d, %Y", "%B %d %Y", "%m/%d/%Y"]
+AIRPORTS_NUMERIC = ["Elevation", "# of Runways", "# ILS", "# GPS", "Helipad"]
+
+# The dashboard's opening fire location and its quick-location buttons
+DEFAULT_LOCATION = (37.0, -120.0)
+LOCATION_PRESETS = {
+    "🏔️ Northern California": (39.7392, -121.8375),
+    "🌲 Oregon": (44.0521, -121.3153),
+    "🏜️ Southern California": (34.0522, -118.2437),
+    "🌵 Arizona": (34.0489, -111.0937),
+    "🌲 Washington": (47.6062, -122.3321),
+    "⛰️ Colorado": (39.5501, -105.7821),
+}
+
+
+def _refuse_write(*args, **kwargs):
+    raise ValueError(
+        "shared reference table is read-only; copy() it or build a new frame "
+        "with assign() instead"
+    )
+
+
+class _ReadOnlyIndexer:
+    """``loc``/``iloc``/``at``/``iat`` that read through and refuse writes"""
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    __setitem__ = _refuse_write
+
+
+class ReadOnlyFrame(pd.DataFrame):
+    """A DataFrame whose in-place changes raise ValueError.
+
+    Covers column and cell assignment, column insertion and removal,
+    ``inplace=True`` methods and replacing ``columns`` or ``index``.
+    Anything derived from it (``assign``, ``iloc``, ``copy``, column
+    selections) is a plain, writable DataFrame.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    __setitem__ = __delitem__ = _refuse_write
+    insert = pop = update = isetitem = _refuse_write
+    _update_inplace = _refuse_write
+
+    def __setattr__(self, name, value):
+        if name in ("columns", "index"):
+            _refuse_write()
+        super().__setattr__(name, value)
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat)
+
+
+def read_only(frame):
+    """``frame`` as a ``ReadOnlyFrame`` over the same data, without copying.
+
+    Reference tables are shared by every session in the process, so an
+    in-place write should fail loudly rather than leak into other sessions.
+    NumPy-backed columns are also flagged non-writeable, so writes through
+    ``to_numpy()`` fail too. Arrow-backed columns are immutable already.
+    """
+    columns = {}
+    for name in frame.columns:
+        series = frame[name]
+        if isinstance(series.dtype, np.dtype):
+            values = np.asarray(series).view()
+            values.flags.writeable = False
+            series = pd.Series(values, index=frame.index, name=name, copy=False)
+        columns[name] = series
+    return ReadOnlyFrame(columns, index=frame.index, copy=False)
+
+
+def load_airport_data(path=AIRPORT_FILE):
+    """Load and process airport data from Excel file"""
+    df = load_snapshot(
+        path,
+        columns=[
+            "Airport",
+            "ICAO",
+            "latitude_deg",
+            "longitude_deg",
+            "Region",
+            "County",
+            "State",
+        ],
+    )
+    # Rename columns to match the expected format
+    df.rename(
+        columns={
+            "Airport": "Name",
+            "ICAO": "ICAO",
+            "latitude_deg": "LAT",
+            "longitude_deg": "LON",
+        },
+        inplace=True,
+    )
+
+    # Filled from airports.csv by AirportIndex.enrich where the airport is known
+    df["Elevation"] = np.nan
+    df["# of Runways"] = np.nan
+
+    return df[BASE_COLUMNS].dropna(subset=["LAT", "LON", "ICAO"]).reset_index(drop=True)
+
+
+def header_date(name):
+    """The date a column header stands for, or None.
+
+    openpyxl hands date headers over as datetimes ("2025-07-07 00:00:00");
+    typed headers such as "Jul 7, 2025" or "7/7/2025" are accepted too.
+    """
+    name = str(name).strip()
+    try:
+        return datetime.date.fromisoformat(name[:10])
+    except ValueError:
+        pass
+    for fmt in HEADER_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(name, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def eod_columns(header):
+    """Tail number and type plus every dated location column of an EOD sheet"""
+    return EOD_ID_COLUMNS + [col for col in header if header_date(col)]
+
+
+def tanker_columns(header):
+    """Pick the tail number, type and most recent end-of-day location column"""
+    latest = max(
+        (
+            (date, i)
+            for i, col in enumerate(header)
+            if (date := header_date(col)) is not None
+        ),
+        default=None,
+    )
+    return EOD_ID_COLUMNS + ([header[latest[1]]] if latest else [])
+
+
+def load_tanker_data(path=TANKER_FILE):
+    """Load and process tanker data from Excel file"""
+    # Every raw column is snapshotted and the location column picked here, so
+    # changing how headers are read never serves a stale snapshot.
+    df = load_snapshot(path)
+    df.columns = df.columns.map(str)
+    df = df[tanker_columns(list(df.columns))]
+    if len(df.columns) <= len(EOD_ID_COLUMNS):
+        raise ValueError(f"{path}: no dated end-of-day location column")
+    df.rename(
+        columns={
+            "TailNumber": "Tanker Number",
+            "Type": "Aircraft Type",
+            df.columns[-1]: "Airport",
+        },
+        inplace=True,
+    )
+    return df[TANKER_COLUMNS]
+
+
+def load_airports(path=AIRPORTS_FILE):
+    """Load the worldwide airport reference table from CSV"""
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    df["ICAO"] = normalize_codes(df["ICAO"])
+    df[AIRPORTS_NUMERIC] = df[AIRPORTS_NUMERIC].astype(float)
+    return df.dropna(subset=["LAT", "LON"]).reset_index(drop=True)
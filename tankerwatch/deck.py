@@ -0,0 +1,365 @@
+"""pydeck layers and map for the TankerWatch dashboard."""
+
+import collections
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+from pydeck.bindings.json_tools import default_serialize
+
+from tankerwatch.assets import ICON_COLUMN, data_url, icon_layer_props
+from tankerwatch.core import DISTANCE_COLUMN, frame_digest, layer_frames
+from tankerwatch.geodesy import great_circle_points
+from tankerwatch.labels import MAP_ZOOM, TEXT_PX, LabelPlacer, to_pixels
+from tankerwatch.timing import NULL_TIMINGS
+
+MAP_STYLE = "mapbox://styles/mapbox/satellite-streets-v11"
+DECK_CACHE_SIZE = 64
+DISPATCH_COLORS = [  # one per fire, cycled
+    [0, 200, 255, 230],
+    [255, 64, 200, 230],
+    [120, 255, 80, 230],
+    [255, 170, 0, 230],
+    [170, 120, 255, 230],
+    [255, 255, 255, 230],
+]
+# The input columns the map is drawn from, hashed for the deck cache key
+TANKER_KEY_COLUMNS = ["LON", "LAT", "label_text"]
+BASE_KEY_COLUMNS = ["LON", "LAT", "ICAO", "Name", "State", DISTANCE_COLUMN]
+COORD_DECIMALS = 5  # about 1 m; what float32 would keep, in fewer JSON digits
+ARC_TOLERANCE_PX = 0.5  # how far a drawn route may stray from its arc on screen
+ARC_MAX_SEGMENTS = 64
+
+
+def layer_data(frame, position, *columns):
+    """Only the columns one layer reads, with coordinates rounded for the wire"""
+    return frame[[*position, *columns]].round(dict.fromkeys(position, COORD_DECIMALS))
+
+
+def position_expr(position):
+    return f"[{position[0]}, {position[1]}]"
+
+
+def icon_layer(frame, icon, position):
+    return pdk.Layer(
+        "IconLayer",
+        data=layer_data(frame, position, ICON_COLUMN),
+        **icon_layer_props(icon),
+        get_position=position_expr(position),
+        get_size=4,
+        size_scale=10,
+        pickable=True,
+    )
+
+
+def label_layer(frame, position, text, size, color, outline, baseline="top"):
+    """Text with an outline drawn by the same layer, so its data is sent once"""
+    return pdk.Layer(
+        "TextLayer",
+        data=layer_data(frame, position, text),
+        get_position=position_expr(position),
+        get_text=text,
+        get_size=size,
+        get_color=color,
+        get_alignment_baseline=f"'{baseline}'",
+        get_text_anchor="'middle'",
+        billboard=True,
+        font_settings={"sdf": True},
+        outline_width=2,
+        outline_color=outline,
+    )
+
+
+def cluster_layer(clusters):
+    """``+N`` badges for tankers collapsed at crowded airports"""
+    return pdk.Layer(
+        "TextLayer",
+        data=layer_data(clusters, ("lon", "lat"), "text"),
+        get_position=position_expr(("lon", "lat")),
+        get_text="text",
+        get_size=TEXT_PX["clusters"],
+        get_color=[255, 255, 255, 255],
+        get_alignment_baseline="'center'",
+        get_text_anchor="'middle'",
+        billboard=True,
+        background=True,
+        get_background_color=[200, 30, 30, 230],
+        background_padding=[4, 2],
+    )
+
+
+def route_paths(starts, ends, zoom=MAP_ZOOM):
+    """Great-circle paths from each ``[lon, lat]`` start to its end.
+
+    Each route is split into just enough straight pieces to stay within
+    ``ARC_TOLERANCE_PX`` of its arc on screen at ``zoom``. The error of an
+    n-piece path falls with n squared from the arc's bulge at its midpoint,
+    so short hops stay two-point lines and zoomed-out views send fewer
+    points. All routes are interpolated in one vectorized pass.
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    mid_lats, mid_lons = great_circle_points(
+        starts[:, 1], starts[:, 0], ends[:, 1], ends[:, 0], 0.5
+    )
+    east = starts[:, 0] + (ends[:, 0] - starts[:, 0] + 180) % 360 - 180
+    x1, y1 = to_pixels(starts[:, 1], starts[:, 0], zoom)
+    x2, y2 = to_pixels(ends[:, 1], east, zoom)
+    xm, ym = to_pixels(mid_lats, mid_lons, zoom)
+    bulge = np.hypot(xm - (x1 + x2) / 2, ym - (y1 + y2) / 2)
+    segments = np.clip(
+        np.ceil(np.sqrt(bulge / ARC_TOLERANCE_PX)), 1, ARC_MAX_SEGMENTS
+    ).astype(int)
+    counts = segments + 1
+    first = np.cumsum(counts) - counts
+    route = np.repeat(np.arange(len(starts)), counts)
+    step = np.arange(counts.sum()) - first[route]
+    lats, lons = great_circle_points(
+        starts[route, 1],
+        starts[route, 0],
+        ends[route, 1],
+        ends[route, 0],
+        step / segments[route],
+    )
+    points = np.column_stack([lons, lats]).round(COORD_DECIMALS).tolist()
+    return [points[i : i + n] for i, n in zip(first.tolist(), counts.tolist())]
+
+
+def route_layer(starts, ends, color, zoom=MAP_ZOOM):
+    """Great-circle routes; ``color`` is one RGBA list or one per route"""
+    data = pd.DataFrame({"path": route_paths(starts, ends, zoom)})
+    if color and isinstance(color[0], list):
+        data["color"], color = color, "color"
+    return pdk.Layer(
+        "PathLayer",
+        data=data,
+        get_path="path",
+        get_color=color,
+        get_width=3,
+        width_units="'pixels'",
+        width_min_pixels=2,
+        width_max_pixels=5,
+        pickable=False,
+    )
+
+
+def build_layers(frames, layout, zoom=MAP_ZOOM):
+    """All map layers for one set of ``core.LayerFrames``, bottom to top.
+
+    Tankers are drawn where ``layout`` (a ``labels.LabelLayout``) put them
+    and routes are densified for ``zoom``.
+    """
+    tanker_position = ("LON_offset", "LAT_offset")
+
+    return [
+        # Fire-to-base routes: red with transparency
+        route_layer(
+            frames.routes["start"].tolist(),
+            frames.routes["end"].tolist(),
+            [255, 0, 0, 200],
+            zoom,
+        ),
+        icon_layer(frames.fire, "flame", ("lon", "lat")),
+        icon_layer(frames.bases, "location", ("LON", "LAT")),
+        # Airport labels: black text, black outline
+        label_layer(
+            frames.bases,
+            ("LON", "LAT"),
+            "label_text",
+            TEXT_PX["bases"],
+            [0, 0, 0, 255],
+            [0, 0, 0, 200],
+        ),
+        icon_layer(layout.tankers, "plane", tanker_position),
+        # Tanker labels: yellow text with a black outline for visibility
+        label_layer(
+            layout.tankers,
+            tanker_position,
+            "label_text",
+            TEXT_PX["tankers"],
+            [255, 255, 0, 255],
+            [0, 0, 0, 200],
+        ),
+        # Distance labels: white text, semi-transparent black outline
+        label_layer(
+            frames.distances,
+            ("lon", "lat"),
+            "text",
+            TEXT_PX["distances"],
+            [255, 255, 255, 255],
+            [0, 0, 0, 180],
+            baseline="bottom",
+        ),
+        cluster_layer(layout.clusters),
+    ]
+
+
+def coverage_layer(coverage, metric="tanker_eta"):
+    """A ``coverage.Coverage`` raster as one image stretched over its bounds"""
+    south, north, west, east = coverage.bounds
+    return pdk.Layer(
+        "BitmapLayer",
+        image=f"'{data_url(coverage.image(metric))}'",
+        bounds=[west, south, east, north],
+        pickable=False,
+    )
+
+
+def dispatch_layers(assignment, layout=None, zoom=MAP_ZOOM):
+    """Routes from each assigned tanker to its fire, plus the fires themselves.
+
+    Routes start at the tanker's icon in ``layout``, or at its airport when
+    it has none (no layout, or collapsed into a badge).
+    """
+    position = ["LON", "LAT"]
+    tankers = assignment.tankers[position]
+    if layout is not None:
+        shown = layout.tankers.reindex(tankers.index)[["LON_offset", "LAT_offset"]]
+        tankers = tankers.where(shown.isna().to_numpy(), shown.to_numpy())
+    fires = assignment.fires.assign(
+        lon=assignment.fires["LON"],
+        lat=assignment.fires["LAT"],
+        label_text=assignment.fires["Fire"].astype(str),
+        **{ICON_COLUMN: "flame"},
+    )
+    fire_of = assignment.fire_rows
+    colors = [DISPATCH_COLORS[i % len(DISPATCH_COLORS)] for i in range(len(fires))]
+    return [
+        route_layer(
+            tankers[position].to_numpy(),
+            fires[["lon", "lat"]].to_numpy()[fire_of],
+            [colors[i] for i in fire_of],
+            zoom,
+        ),
+        icon_layer(fires, "flame", ("lon", "lat")),
+        label_layer(
+            fires,
+            ("lon", "lat"),
+            "label_text",
+            16,
+            [255, 140, 0, 255],
+            [0, 0, 0, 200],
+        ),
+    ]
+
+
+class FrozenDeck(pdk.Deck):
+    """A Deck that serializes to compact JSON once and then reuses the result"""
+
+    _json = None
+    _sizes = None
+
+    def to_json(self):
+        if self._json is None:
+            # pydeck's own to_json indents by two spaces; drop the whitespace.
+            self._json = json.dumps(
+                self, sort_keys=True, default=default_serialize, separators=(",", ":")
+            )
+        return self._json
+
+
+def payload_sizes(deck):
+    """Serialized bytes per layer (by type and position) plus the whole deck.
+
+    Worked out once per ``FrozenDeck``, which the deck cache then reuses.
+    """
+    if deck._sizes is None:
+        payload = deck.to_json()
+        sizes = {
+            f"{i}:{layer['@@type']}": len(
+                json.dumps(layer, sort_keys=True, separators=(",", ":"))
+            )
+            for i, layer in enumerate(json.loads(payload)["layers"])
+        }
+        sizes["total"] = len(payload)
+        deck._sizes = sizes
+    return deck._sizes
+
+
+def build_deck(location, layers, mapbox_api_key, height=600, zoom=MAP_ZOOM):
+    lat, lon = location
+    return FrozenDeck(
+        map_style=MAP_STYLE,
+        initial_view_state=pdk.ViewState(
+            latitude=lat, longitude=lon, zoom=zoom, pitch=45, bearing=0
+        ),
+        layers=layers,
+        api_keys={"mapbox": mapbox_api_key},
+        height=height,
+    )
+
+
+_deck_cache = collections.OrderedDict()
+_deck_lock = threading.Lock()
+_label_placer = LabelPlacer()
+
+
+def cached_deck(
+    location,
+    closest_bases,
+    tankers,
+    mapbox_api_key,
+    coverage=None,
+    coverage_metric="tanker_eta",
+    assignment=None,
+    cluster_labels=True,
+    zoom=MAP_ZOOM,
+    timings=NULL_TIMINGS,
+):
+    """The map for these inputs, reused across reruns and sessions.
+
+    Decks are keyed on (fire location, tanker-state hash, base-set hash,
+    clustering choice, coverage raster, dispatch assignment, zoom), so
+    unchanged inputs skip map frames, label layout, layer construction and
+    JSON serialization. ``coverage`` is drawn under every other layer and a
+    ``dispatch.Assignment`` over them. ``cluster_labels`` collapses tankers
+    that do not fit around a busy airport into a count badge.
+
+    The map opens at ``zoom``, and labels and route detail are laid out for
+    it. Streamlit does not report the viewport back, so the dashboard passes
+    its opening zoom; after the user zooms, routes keep that detail.
+    """
+    with timings.span("deck_cache", rows=len(tankers)) as counters:
+        key = (
+            tuple(float(x) for x in location),
+            frame_digest(tankers[TANKER_KEY_COLUMNS]),
+            frame_digest(closest_bases[BASE_KEY_COLUMNS]),
+            cluster_labels,
+            zoom,
+            mapbox_api_key,
+            (coverage.digest, coverage_metric) if coverage is not None else None,
+            (
+                frame_digest(assignment.fires, assignment.table)
+                if assignment is not None
+                else None
+            ),
+        )
+        with _deck_lock:
+            deck = _deck_cache.get(key)
+            if deck is not None:
+                _deck_cache.move_to_end(key)
+        counters["cache_hit"] = deck is not None
+    if deck is not None:
+        return deck
+
+    with timings.span("layer_frames", rows=len(tankers)):
+        frames = layer_frames(location, closest_bases, tankers)
+    with timings.span("label_layout") as counters:
+        layout = _label_placer.layout(frames, zoom, cluster_labels)
+        counters.update(cache_hit=layout.cache_hit, clustered=layout.hidden)
+    with timings.span("deck_build"):
+        layers = build_layers(frames, layout, zoom)
+        if coverage is not None:
+            layers.insert(0, coverage_layer(coverage, coverage_metric))
+        if assignment is not None:
+            layers += dispatch_layers(assignment, layout, zoom)
+        deck = build_deck(location, layers, mapbox_api_key, zoom=zoom)
+    with timings.span("deck_json") as counters:
+        counters["bytes"] = len(deck.to_json())
+    with _deck_lock:
+        _deck_cache[key] = deck
+        while len(_deck_cache) > DECK_CACHE_SIZE:
+            _deck_cache.popitem(last=False)
+    return deck
@@ -0,0 +1,164 @@
+"""Multi-fire dispatch: assign tankers to several fires at once.
+
+Each fire asks for a number of tankers, and each tanker flies to at most one
+fire. The fire x tanker cost matrix (ETA by aircraft type, or distance) is
+built in one vectorized pass. Each fire's row is repeated once per tanker it
+needs, and the resulting rectangular assignment problem is solved exactly
+with a shortest augmenting path (Jonker-Volgenant) solver whose inner loop
+runs over whole rows at a time.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from tankerwatch.eta import ETA_COLUMN, PerformanceTable, eta_minutes
+from tankerwatch.geodesy import vincenty_nm
+
+FIRE_COLUMNS = ["Fire", "LAT", "LON", "Tankers"]
+DISPATCH_COSTS = {"eta": "ETA (min)", "nm": "Distance (nm)"}
+ASSIGNMENT_COLUMNS = [
+    "Fire",
+    "Tanker Number",
+    "Aircraft Type",
+    "Airport",
+    "Distance (nm)",
+    ETA_COLUMN,
+]
+
+
+class Assignment(NamedTuple):
+    """Solved dispatch; ``table`` has one row per filled slot, by fire then ETA"""
+
+    table: pd.DataFrame
+    fires: pd.DataFrame
+    tankers: pd.DataFrame  # the assigned fleet rows, aligned with ``table``
+    fire_rows: np.ndarray  # positions in ``fires``, aligned with ``table``
+    unfilled: int  # fire slots left without a tanker
+    total: float  # summed cost of the assignment
+
+
+def linear_assignment(cost):
+    """Minimum-cost matching of rows to columns of a (possibly rectangular) matrix.
+
+    Returns ``(rows, cols)`` index arrays covering ``min(cost.shape)`` pairs,
+    sorted by row. ``inf`` marks forbidden pairs; ValueError if no complete
+    matching of the smaller side avoids them.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    u, v = np.zeros(n), np.zeros(m)
+    col4row = np.full(n, -1)
+    row4col = np.full(m, -1)
+
+    for current in range(n):
+        # Dijkstra over reduced costs from ``current`` to a free column.
+        shortest = np.full(m, np.inf)
+        path = np.full(m, -1)
+        remaining = np.ones(m, dtype=bool)
+        scanned_rows = []
+        row, low, sink = current, 0.0, -1
+        while sink < 0:
+            scanned_rows.append(row)
+            reduced = low + cost[row] - u[row] - v
+            better = remaining & (reduced < shortest)
+            path[better] = row
+            shortest[better] = reduced[better]
+            candidates = np.flatnonzero(remaining)
+            low = shortest[candidates].min()
+            if not np.isfinite(low):
+                raise ValueError("No feasible assignment avoids the forbidden pairs")
+            ties = candidates[shortest[candidates] == low]
+            free = ties[row4col[ties] < 0]
+            col = free[0] if len(free) else ties[0]
+            remaining[col] = False
+            if row4col[col] < 0:
+                sink = col
+            else:
+                row = row4col[col]
+
+        # Keep the reduced costs non-negative, then flip the augmenting path.
+        u[current] += low
+        others = np.array(scanned_rows[1:], dtype=int)
+        u[others] += low - shortest[col4row[others]]
+        done = ~remaining
+        v[done] -= low - shortest[done]
+        col = sink
+        while True:
+            row = path[col]
+            row4col[col] = row
+            col4row[row], col = col, col4row[row]
+            if row == current:
+                break
+
+    rows = np.arange(n)
+    if transposed:
+        order = np.argsort(col4row)
+        return col4row[order], rows[order]
+    return rows, col4row
+
+
+def cost_matrix(fires, fleet, performance=None):
+    """(fires, tankers) distances in NM and ETAs in minutes"""
+    nm = vincenty_nm(
+        fires["LAT"].to_numpy(float)[:, None],
+        fires["LON"].to_numpy(float)[:, None],
+        fleet["LAT"].to_numpy(float)[None, :],
+        fleet["LON"].to_numpy(float)[None, :],
+    )
+    resolved = (performance or PerformanceTable()).resolve(fleet["Aircraft Type"])
+    return nm, eta_minutes(nm, resolved.cruise_kt, resolved.spinup_min)
+
+
+def assign(fires, fleet, cost="eta", performance=None):
+    """Optimal tankers for each fire in ``fires`` (``FIRE_COLUMNS``) from ``fleet``.
+
+    ``fleet`` needs ``Tanker Number``, ``Aircraft Type``, ``Airport``, ``LAT``
+    and ``LON``; tankers without coordinates are left out. When the fires ask
+    for more tankers than there are, every tanker is used and the slots whose
+    tankers would cost the most stay empty.
+    """
+    if cost not in DISPATCH_COSTS:
+        raise ValueError(
+            f"Unknown cost {cost!r}; expected one of {list(DISPATCH_COSTS)}"
+        )
+    fires = fires.dropna(subset=["LAT", "LON"]).reset_index(drop=True)
+    names = fires["Fire"].astype(object)
+    fires["Fire"] = names.where(
+        names.notna(), [f"Fire {i + 1}" for i in range(len(fires))]
+    )
+    demand = fires["Tankers"].fillna(1).clip(lower=0).astype(int).to_numpy()
+    fleet = fleet.dropna(subset=["LAT", "LON"])
+    slots = np.repeat(np.arange(len(fires)), demand)
+
+    nm, eta = cost_matrix(fires, fleet, performance)
+    costs = eta if cost == "eta" else nm
+    rows, cols = np.empty(0, dtype=int), np.empty(0, dtype=int)
+    if len(slots) and len(fleet):
+        rows, cols = linear_assignment(costs[slots])
+
+    fire_of = slots[rows]
+    table = pd.DataFrame(
+        {
+            "Fire": fires["Fire"].to_numpy(dtype=object)[fire_of],
+            "Tanker Number": fleet["Tanker Number"].to_numpy(dtype=object)[cols],
+            "Aircraft Type": fleet["Aircraft Type"].to_numpy(dtype=object)[cols],
+            "Airport": fleet["Airport"].to_numpy(dtype=object)[cols],
+            "Distance (nm)": nm[fire_of, cols],
+            ETA_COLUMN: eta[fire_of, cols],
+        },
+        columns=ASSIGNMENT_COLUMNS,
+    )
+    order = np.lexsort((table[ETA_COLUMN].to_numpy(), fire_of))
+    return Assignment(
+        table.iloc[order].reset_index(drop=True),
+        fires,
+        fleet.iloc[cols[order]],
+        fire_of[order],
+        len(slots) - len(rows),
+        float(costs[fire_of, cols].sum()),
+    )
@@ -0,0 +1,100 @@
+"""Time-to-fire estimates by aircraft type.
+
+ETA is spin-up (dispatch to wheels-up) plus the leg to the fire at cruise
+speed. A drop cycle is the return leg to the tanker's base plus the reload
+turnaround. Scoopers usually refill from nearby water, so their cycle time
+here is an upper bound.
+"""
+
+import functools
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+ETA_COLUMN = "ETA (min)"
+CYCLE_COLUMN = "Drop Cycle (min)"
+PERFORMANCE_COLUMNS = ["Class", "Cruise (kt)", "Spin-up (min)", "Turnaround (min)"]
+
+AIRCRAFT_PERFORMANCE = pd.DataFrame(
+    [
+        ("DC-10", "VLAT", 330, 20, 40),
+        ("B737", "LAT", 340, 15, 25),
+        ("BAE-146", "LAT", 320, 15, 25),
+        ("MD87", "LAT", 300, 15, 25),
+        ("C-130", "LAT", 290, 15, 25),
+        ("DH-8D", "LAT", 300, 15, 20),
+        ("CL-415", "Scooper", 180, 10, 15),
+        ("CL-215T", "Scooper", 165, 10, 15),
+    ],
+    columns=["Aircraft Type"] + PERFORMANCE_COLUMNS,
+).set_index("Aircraft Type")
+DEFAULT_PERFORMANCE = ("LAT", 280, 15, 25)  # used for types not in the table
+# CSV that replaces AIRCRAFT_PERFORMANCE everywhere (see load_performance)
+PERFORMANCE_FILE = os.environ.get("TANKERWATCH_PERFORMANCE")
+
+
+def normalize_types(types):
+    """Upper-case aircraft types and drop spaces and dashes ("BAE 146" == "BAE-146")"""
+    types = pd.Series(types, dtype="object")
+    normalized = types.where(
+        types.isna(),
+        types.astype(str).str.upper().str.replace(r"[\s\-]", "", regex=True),
+    )
+    return normalized.mask(normalized == "")
+
+
+def load_performance(path):
+    """Read a performance table from CSV (``Aircraft Type`` + PERFORMANCE_COLUMNS)"""
+    return pd.read_csv(path).set_index("Aircraft Type")[PERFORMANCE_COLUMNS]
+
+
+@functools.lru_cache(maxsize=None)
+def default_performance(path=PERFORMANCE_FILE):
+    """The table from ``path`` when one is configured, else AIRCRAFT_PERFORMANCE"""
+    return AIRCRAFT_PERFORMANCE if path is None else load_performance(path)
+
+
+class Performance(NamedTuple):
+    """Per-row performance figures, aligned with the input types"""
+
+    cruise_kt: np.ndarray
+    spinup_min: np.ndarray
+    turnaround_min: np.ndarray
+    known: np.ndarray  # False where the default performance was used
+
+
+class PerformanceTable:
+    """Aircraft type -> performance lookup, resolved a whole column at a time"""
+
+    def __init__(self, table=None, default=DEFAULT_PERFORMANCE):
+        table = default_performance() if table is None else table
+        table = table[~normalize_types(table.index).duplicated().to_numpy()]
+        self.table = table
+        self._types = pd.Index(normalize_types(table.index))
+        # The default row sits in the last slot, where unknown types (-1) land.
+        self._cruise = np.append(table["Cruise (kt)"].to_numpy(float), default[1])
+        self._spinup = np.append(table["Spin-up (min)"].to_numpy(float), default[2])
+        self._turnaround = np.append(
+            table["Turnaround (min)"].to_numpy(float), default[3]
+        )
+
+    def resolve(self, types):
+        positions = self._types.get_indexer(normalize_types(types))
+        return Performance(
+            self._cruise[positions],
+            self._spinup[positions],
+            self._turnaround[positions],
+            positions >= 0,
+        )
+
+
+def eta_minutes(distance_nm, cruise_kt, spinup_min):
+    """Minutes from dispatch to over the fire"""
+    return spinup_min + np.asarray(distance_nm, dtype=float) / cruise_kt * 60
+
+
+def cycle_minutes(distance_nm, cruise_kt, turnaround_min):
+    """Minutes from one drop to the next: back to base, reload, back out"""
+    return 2 * np.asarray(distance_nm, dtype=float) / cruise_kt * 60 + turnaround_min
@@ -0,0 +1,202 @@
+"""Live tanker position feed.
+
+A background asyncio loop reads position reports, one JSON object per line,
+from a JSONL file (followed like ``tail -f``) or from UDP datagrams, a local
+stand-in for an ADS-B style feed:
+
+    {"tanker": "N131CG", "airport": "KFAT"}
+    {"tanker": "N132CG", "lat": 38.51, "lon": -121.49, "ts": "2025-07-08T17:02:11Z"}
+
+Reports are coalesced per tanker and published to ``LatestPositions`` at
+most once per ``min_interval``, so a burst of reports for one aircraft costs
+one table update. The queue between the reader and the coalescer is
+bounded: file input waits when it is full, UDP input drops datagrams.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+FEED_SOURCE = os.environ.get("TANKERWATCH_FEED")  # udp://host:port or a JSONL path
+FEED_INTERVAL_S = float(os.environ.get("TANKERWATCH_FEED_INTERVAL", 2.0))
+FEED_COLUMNS = ["Tanker Number", "Airport", "LAT", "LON", "Reported"]
+
+
+def parse_update(line):
+    """A feed line as a report dict keyed by ``FEED_COLUMNS``, or None if unusable"""
+    try:
+        message = json.loads(line)
+        tanker = str(message["tanker"]).strip()
+        airport = message.get("airport")
+        lat, lon = message.get("lat"), message.get("lon")
+        if lat is not None and lon is not None:
+            lat, lon = float(lat), float(lon)
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                return None
+        elif not airport:
+            return None
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+    if not tanker:
+        return None
+    return {
+        "Tanker Number": tanker,
+        "Airport": str(airport).strip().upper() if airport else None,
+        "LAT": lat,
+        "LON": lon,
+        "Reported": message.get("ts"),
+    }
+
+
+class LatestPositions:
+    """Most recent report per tanker, stamped with the publish sequence number"""
+
+    def __init__(self):
+        self.seq = 0
+        self._rows = {}  # tanker -> (seq, report)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def publish(self, reports):
+        """Store a batch of ``{tanker: report}``; returns its sequence number"""
+        with self._lock:
+            self.seq += 1
+            for tanker, report in reports.items():
+                self._rows[tanker] = (self.seq, report)
+            return self.seq
+
+    def changes_since(self, seq):
+        """(reports newer than ``seq``, current seq): the latest one per tanker"""
+        with self._lock:
+            rows = [report for s, report in self._rows.values() if s > seq]
+            current = self.seq
+        return pd.DataFrame(rows, columns=FEED_COLUMNS), current
+
+    def table(self):
+        return self.changes_since(0)[0]
+
+
+class _DatagramQueue(asyncio.DatagramProtocol):
+    def __init__(self, feed, queue):
+        self.feed, self.queue = feed, queue
+
+    def datagram_received(self, data, addr):
+        for line in data.splitlines():
+            try:
+                self.queue.put_nowait(line)
+            except asyncio.QueueFull:
+                self.feed.dropped += 1
+
+
+class PositionFeed:
+    """Read a position feed on a background thread into ``self.latest``.
+
+    ``source`` is ``udp://host:port`` or the path of a JSONL file.
+    """
+
+    def __init__(self, source, min_interval=1.0, queue_size=10_000, poll_s=0.25):
+        self.source = str(source)
+        self.min_interval = min_interval
+        self.queue_size = queue_size
+        self.poll_s = poll_s
+        self.latest = LatestPositions()
+        self.received = self.invalid = self.coalesced = self.dropped = 0
+        self._loop = self._task = self._thread = None
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._task = self._loop.create_task(self._run())
+            ready.set()
+            try:
+                self._loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="position-feed", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self, timeout=5):
+        if self._thread is None:
+            return
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "invalid": self.invalid,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "published": self.latest.seq,
+            "tankers": len(self.latest),
+        }
+
+    async def _run(self):
+        queue = asyncio.Queue(self.queue_size)
+        if self.source.startswith("udp://"):
+            host, _, port = self.source[len("udp://") :].rpartition(":")
+            transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: _DatagramQueue(self, queue), local_addr=(host, int(port))
+            )
+            try:
+                await self._coalesce(queue)
+            finally:
+                transport.close()
+        else:
+            await asyncio.gather(
+                self._follow(Path(self.source), queue), self._coalesce(queue)
+            )
+
+    async def _follow(self, path, queue):
+        """Feed the lines of ``path`` into ``queue``, waiting for appended lines"""
+        while not path.exists():
+            await asyncio.sleep(self.poll_s)
+        with open(path, "rb") as f:
+            partial = b""
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    partial += line
+                    await asyncio.sleep(self.poll_s)
+                    continue
+                await queue.put(partial + line)
+                partial = b""
+
+    async def _coalesce(self, queue):
+        loop = asyncio.get_running_loop()
+        pending, last = {}, float("-inf")
+        while True:
+            wait = None
+            if pending:
+                wait = max(0.0, last + self.min_interval - loop.time())
+            try:
+                lines = [await asyncio.wait_for(queue.get(), wait)]
+                while not queue.empty() and len(lines) < self.queue_size:
+                    lines.append(queue.get_nowait())
+            except asyncio.TimeoutError:
+                lines = []
+            for line in lines:
+                self.received += 1
+                report = parse_update(line)
+                if report is None:
+                    self.invalid += 1
+                    continue
+                self.coalesced += report["Tanker Number"] in pending
+                pending[report["Tanker Number"]] = report
+            if pending and loop.time() - last >= self.min_interval:
+                self.latest.publish(pending)
+                pending, last = {}, loop.time()
@@ -0,0 +1,208 @@
+"""Incrementally maintained tanker table.
+
+``st.data_editor`` keeps its changes as deltas against the table it was
+given: ``edited_rows`` ({position: {column: value}}), ``added_rows`` (list of
+{column: value}) and ``deleted_rows`` (list of positions). The deltas are
+cumulative, so ``FleetState`` diffs them against the last set it applied and
+recomputes coordinates, distances, ETAs and map labels only for the rows
+that actually changed.
+"""
+
+import numpy as np
+import pandas as pd
+
+from tankerwatch.core import DISTANCE_COLUMN, tanker_positions
+from tankerwatch.data import TANKER_COLUMNS
+from tankerwatch.eta import CYCLE_COLUMN, ETA_COLUMN, PerformanceTable
+from tankerwatch.eta import cycle_minutes, eta_minutes
+from tankerwatch.geodesy import distances_nm
+from tankerwatch.icao import Resolved, normalize_codes
+
+LAYER_COLUMNS = ["label_text"]
+PERFORMANCE_COLUMNS = ["cruise_kt", "spinup_min", "turnaround_min"]
+TIMING_COLUMNS = [ETA_COLUMN, CYCLE_COLUMN]
+
+
+class FleetState:
+    """Tanker rows plus their derived coordinates, distance and map labels.
+
+    Rows are keyed by their position in the original table; added rows get
+    keys after the last original row, in the order the editor added them.
+    """
+
+    def __init__(self, tankers, index, location=None, performance=None):
+        self.original = tankers[TANKER_COLUMNS].reset_index(drop=True)
+        self.index = index
+        self.performance = performance or PerformanceTable()
+        self.location = None
+        self.version = 0
+        self._edited, self._added, self._deleted = {}, [], set()
+
+        self.frame = self.original.assign(LAT=np.nan, LON=np.nan)
+        self.frame[DISTANCE_COLUMN] = np.nan
+        for column in PERFORMANCE_COLUMNS + TIMING_COLUMNS + LAYER_COLUMNS:
+            self.frame[column] = np.nan
+        self.frame["label_text"] = self.frame["label_text"].astype(object)
+        self._resolve(self.frame.index)
+        self._place(None)
+        if location is not None:
+            self.set_location(location)
+
+    # --------------------------
+    # Updates
+    # --------------------------
+    def apply_edits(self, edits):
+        """Apply the editor's current deltas; returns the keys that changed"""
+        edits = edits or {}
+        edited = {int(k): dict(v) for k, v in edits.get("edited_rows", {}).items()}
+        added = [dict(row) for row in edits.get("added_rows", [])]
+        deleted = {int(k) for k in edits.get("deleted_rows", [])}
+        n = len(self.original)
+
+        rows = {}  # key -> column values, for rows to (re)write
+        for key in self._edited.keys() | edited.keys():
+            if self._edited.get(key) != edited.get(key) and key not in deleted:
+                rows[key] = {**self.original.iloc[key].to_dict(), **edited.get(key, {})}
+        for key in self._deleted - deleted:
+            rows[key] = {**self.original.iloc[key].to_dict(), **edited.get(key, {})}
+        for i, row in enumerate(added):
+            if i >= len(self._added) or self._added[i] != row:
+                rows[n + i] = {column: row.get(column) for column in TANKER_COLUMNS}
+        removed = (deleted - self._deleted) | {
+            n + i for i in range(len(added), len(self._added))
+        }
+        removed &= set(self.frame.index)
+
+        self._edited, self._added, self._deleted = edited, added, deleted
+        if not rows and not removed:
+            return pd.Index([])
+
+        touched = [key for key in rows if key in self.frame.index] + sorted(removed)
+        affected = set(self.frame.loc[touched, "Airport"].dropna())
+        self.frame = self.frame.drop(index=list(removed))
+
+        update = pd.DataFrame.from_dict(
+            rows, orient="index", columns=TANKER_COLUMNS
+        ).astype(self.original.dtypes.to_dict())
+        new_keys = update.index.difference(self.frame.index)
+        if len(new_keys):
+            self.frame = pd.concat([self.frame, update.loc[new_keys]])
+            if not self.frame.index.is_monotonic_increasing:
+                self.frame = self.frame.sort_index()
+        self.frame.loc[update.index, TANKER_COLUMNS] = update
+        affected |= set(update["Airport"].dropna())
+
+        self._resolve(update.index)
+        self._place(affected)
+        self.version += 1
+        return update.index.union(pd.Index(sorted(removed)))
+
+    def apply_positions(self, reports):
+        """Apply live position reports; returns the keys that changed.
+
+        ``reports`` has the ``feed.FEED_COLUMNS``: a tanker number plus an
+        airport code, coordinates, or both. Coordinates win over the
+        airport's. Tankers not in the table are ignored.
+        """
+        tankers = self.frame["Tanker Number"]
+        first = ~tankers.duplicated()
+        positions = pd.Index(tankers[first]).get_indexer(reports["Tanker Number"])
+        reports = reports[positions >= 0]
+        keys = self.frame.index[first.to_numpy()][positions[positions >= 0]]
+        if not len(keys):
+            return pd.Index([])
+
+        affected = set(self.frame.loc[keys, "Airport"].dropna())
+        moved = reports["Airport"].notna().to_numpy()
+        self.frame.loc[keys[moved], "Airport"] = reports["Airport"].to_numpy()[moved]
+        affected |= set(reports["Airport"].dropna())
+        self._resolve(keys[moved])
+
+        located = (reports["LAT"].notna() & reports["LON"].notna()).to_numpy()
+        if located.any():
+            located_keys = keys[located]
+            self.frame.loc[located_keys, "LAT"] = reports["LAT"].to_numpy(float)[
+                located
+            ]
+            self.frame.loc[located_keys, "LON"] = reports["LON"].to_numpy(float)[
+                located
+            ]
+            if self.location is not None:
+                rows = self.frame.loc[located_keys]
+                self.frame.loc[located_keys, DISTANCE_COLUMN] = distances_nm(
+                    self.location, rows["LAT"], rows["LON"]
+                )
+                self._time(located_keys)
+
+        self._place(affected)
+        self.version += 1
+        return keys
+
+    def set_location(self, location):
+        """Recompute every distance when the fire moves"""
+        location = tuple(float(x) for x in location)
+        if location == self.location:
+            return
+        self.location = location
+        self.frame[DISTANCE_COLUMN] = distances_nm(
+            location, self.frame["LAT"], self.frame["LON"]
+        )
+        self._time(self.frame.index)
+        self.version += 1
+
+    def _resolve(self, keys):
+        if not len(keys):
+            return
+        resolved = self.index.resolve(self.frame.loc[keys, "Airport"])
+        self.frame.loc[keys, "LAT"] = resolved.lat
+        self.frame.loc[keys, "LON"] = resolved.lon
+        performance = self.performance.resolve(self.frame.loc[keys, "Aircraft Type"])
+        for column, values in zip(PERFORMANCE_COLUMNS, performance):
+            self.frame.loc[keys, column] = values
+        if self.location is not None:
+            self.frame.loc[keys, DISTANCE_COLUMN] = distances_nm(
+                self.location, resolved.lat, resolved.lon
+            )
+            self._time(keys)
+
+    def _time(self, keys):
+        rows = self.frame.loc[keys]
+        self.frame.loc[keys, ETA_COLUMN] = eta_minutes(
+            rows[DISTANCE_COLUMN], rows["cruise_kt"], rows["spinup_min"]
+        )
+        self.frame.loc[keys, CYCLE_COLUMN] = cycle_minutes(
+            rows[DISTANCE_COLUMN], rows["cruise_kt"], rows["turnaround_min"]
+        )
+
+    def _place(self, airports):
+        """Recompute map labels for the given airports (None: all)"""
+        if airports is not None and not airports:
+            return
+        rows = self.frame
+        if airports is not None:
+            rows = rows[rows["Airport"].isin(airports)]
+        placed = tanker_positions(
+            rows[TANKER_COLUMNS],
+            Resolved(rows["LAT"].to_numpy(), rows["LON"].to_numpy(), None, None),
+        )
+        self.frame.loc[rows.index, LAYER_COLUMNS] = np.nan
+        self.frame.loc[placed.index, LAYER_COLUMNS] = placed[LAYER_COLUMNS]
+
+    # --------------------------
+    # Views
+    # --------------------------
+    def table(self):
+        """Tanker columns plus distance, ETA and drop cycle, soonest first"""
+        return self.frame[
+            TANKER_COLUMNS + [DISTANCE_COLUMN] + TIMING_COLUMNS
+        ].sort_values(ETA_COLUMN, kind="stable", na_position="last")
+
+    def placed(self):
+        """Tankers at known bases with their map positions and labels"""
+        return self.frame.dropna(subset=["LAT", "LON"])
+
+    @property
+    def unknown(self):
+        """Distinct airport codes that did not resolve to a base"""
+        codes = normalize_codes(self.frame["Airport"])
+        return sorted(codes[codes.notna() & self.frame["LAT"].isna()].unique())
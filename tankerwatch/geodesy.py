@@ -0,0 +1,164 @@
+"""Batched distance calculations between a fire and many points.
+
+Two methods are available:
+
+* ``"haversine"`` treats the Earth as a sphere with the IUGG mean radius.
+  It is the fastest option; compared to the WGS-84 ellipsoid its error is
+  below 0.56% of the distance (about 3 nm over 500 nm).
+* ``"vincenty"`` solves Vincenty's inverse problem on WGS-84 for all pairs at
+  once. Converged pairs are accurate to about 0.5 mm. The rare nearly
+  antipodal pairs where Vincenty does not converge fall back to geopy's
+  Karney solver, which is accurate to a few nanometres.
+
+All functions accept scalars or array-likes, broadcast NumPy-style and
+propagate NaN coordinates as NaN distances. ``great_circle_points``
+interpolates along routes for drawing them.
+"""
+
+import numpy as np
+
+KM_PER_NM = 1.852
+EARTH_RADIUS_KM = 6371.0088  # IUGG mean radius
+HAVERSINE_MAX_REL_ERROR = 0.0056
+
+WGS84_A = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+METHODS = ("haversine", "vincenty")
+
+
+def haversine_nm(lat1, lon1, lat2, lon2):
+    """Great-circle distance in nautical miles on the mean-radius sphere"""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    central_angle = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return central_angle * EARTH_RADIUS_KM / KM_PER_NM
+
+
+def vincenty_nm(lat1, lon1, lat2, lon2, tol=1e-12, max_iter=200):
+    """Ellipsoidal (WGS-84) distance in nautical miles using Vincenty's formula"""
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (lat1, lon1, lat2, lon2))
+    )
+    shape = lat1.shape
+    lat1, lon1, lat2, lon2 = (x.ravel() for x in (lat1, lon1, lat2, lon2))
+
+    u1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    big_l = np.radians(lon2 - lon1)
+    lam = big_l.copy()
+    # NaN pairs can never converge; mark them done so they stay NaN.
+    active = ~np.isnan(lam + u1 + u2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(max_iter):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(
+                cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam
+            )
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(
+                sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma
+            )
+            cos2_alpha = 1 - sin_alpha**2
+            # Equatorial lines have cos2_alpha == 0 and no defined cos_2sm.
+            cos_2sm = np.where(
+                cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha
+            )
+            c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            lam_next = big_l + (1 - c) * WGS84_F * sin_alpha * (
+                sigma
+                + c * sin_sigma * (cos_2sm + c * cos_sigma * (-1 + 2 * cos_2sm**2))
+            )
+            converged = np.abs(lam_next - lam) <= tol
+            lam = np.where(active, lam_next, lam)
+            active &= ~converged
+            if not active.any():
+                break
+
+        u_sq = cos2_alpha * (WGS84_A**2 - WGS84_B**2) / WGS84_B**2
+        big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+        big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+        delta_sigma = (
+            big_b
+            * sin_sigma
+            * (
+                cos_2sm
+                + big_b
+                / 4
+                * (
+                    cos_sigma * (-1 + 2 * cos_2sm**2)
+                    - big_b
+                    / 6
+                    * cos_2sm
+                    * (-3 + 4 * sin_sigma**2)
+                    * (-3 + 4 * cos_2sm**2)
+                )
+            )
+        )
+        km = WGS84_B * big_a * (sigma - delta_sigma)
+
+    # Nearly antipodal pairs: defer to geopy's Karney implementation.
+    if active.any():
+        # geopy pulls in every geocoder (~0.1 s); import it only when needed.
+        from geopy.distance import geodesic
+
+        for i in np.flatnonzero(active):
+            km[i] = geodesic((lat1[i], lon1[i]), (lat2[i], lon2[i])).km
+
+    return (km / KM_PER_NM).reshape(shape)
+
+
+def great_circle_points(lat1, lon1, lat2, lon2, fractions):
+    """Points ``fractions`` (0 to 1) of the way from point 1 to point 2.
+
+    Interpolates along the great circle on the sphere, which stays well
+    under a map pixel from the WGS-84 geodesic at dispatch ranges. Returns
+    (lats, lons); longitudes stay continuous from ``lon1`` and may leave
+    ±180 so paths do not jump at the antimeridian.
+    """
+    lat1, lon1, lat2, lon2, fractions = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (lat1, lon1, lat2, lon2, fractions))
+    )
+    phi1, lam1, phi2, lam2 = (np.radians(x) for x in (lat1, lon1, lat2, lon2))
+    p1 = np.stack(
+        [np.cos(phi1) * np.cos(lam1), np.cos(phi1) * np.sin(lam1), np.sin(phi1)]
+    )
+    p2 = np.stack(
+        [np.cos(phi2) * np.cos(lam2), np.cos(phi2) * np.sin(lam2), np.sin(phi2)]
+    )
+    angle = np.arccos(np.clip((p1 * p2).sum(axis=0), -1.0, 1.0))
+    sin_angle = np.sin(angle)
+    # Coincident points: any weights summing to one give the point itself.
+    short = sin_angle < 1e-12
+    sin_angle = np.where(short, 1.0, sin_angle)
+    w1 = np.where(short, 1 - fractions, np.sin((1 - fractions) * angle) / sin_angle)
+    w2 = np.where(short, fractions, np.sin(fractions * angle) / sin_angle)
+    x, y, z = w1 * p1 + w2 * p2
+    lats = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    lons = np.degrees(np.arctan2(y, x))
+    return lats, lon1 + (lons - lon1 + 180) % 360 - 180
+
+
+def distances_nm(origin, lats, lons, method="vincenty"):
+    """Distances in nautical miles from one (lat, lon) origin to many points"""
+    if method == "haversine":
+        return haversine_nm(origin[0], origin[1], lats, lons)
+    if method == "vincenty":
+        return vincenty_nm(origin[0], origin[1], lats, lons)
+    raise ValueError(f"Unknown distance method {method!r}; expected one of {METHODS}")
+
+
+def distance_nm(coord1, coord2, method="vincenty"):
+    """Distance in nautical miles between two (lat, lon) points"""
+    return float(distances_nm(coord1, coord2[0], coord2[1], method=method))
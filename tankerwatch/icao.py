@@ -0,0 +1,77 @@
+"""Hash index from ICAO code to tanker base coordinates."""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_codes(codes):
+    """Upper-case and strip a Series of airport codes, keeping missing values as NA"""
+    codes = pd.Series(codes, dtype="object")
+    normalized = codes.where(codes.isna(), codes.astype(str).str.strip().str.upper())
+    return normalized.mask(normalized == "")
+
+
+class Resolved(NamedTuple):
+    """Coordinates for a batch of codes, aligned with the input order"""
+
+    lat: np.ndarray
+    lon: np.ndarray
+    row: np.ndarray  # positional row in the base table, -1 when unresolved
+    unknown: list  # distinct non-empty codes with no matching base
+
+
+class IcaoIndex:
+    """Prebuilt ICAO -> (lat, lon, row) lookup over the base table.
+
+    Codes are normalized for case and surrounding whitespace. When a code
+    appears more than once the first row wins, matching the old
+    ``airport_df[airport_df["ICAO"] == code].iloc[0]`` behaviour.
+    """
+
+    def __init__(self, codes, lats, lons):
+        normalized = normalize_codes(codes).to_numpy()
+        keep = ~pd.isna(normalized) & ~pd.Series(normalized).duplicated().to_numpy()
+        self._rows = np.flatnonzero(keep)
+        self._codes = pd.Index(normalized[keep])
+        self._lats = np.asarray(lats, dtype=float)[keep]
+        self._lons = np.asarray(lons, dtype=float)[keep]
+        self._lookup = {
+            code: (lat, lon, row)
+            for code, lat, lon, row in zip(
+                self._codes,
+                self._lats.tolist(),
+                self._lons.tolist(),
+                self._rows.tolist(),
+            )
+        }
+
+    @classmethod
+    def from_frame(cls, df, code_col="ICAO", lat_col="LAT", lon_col="LON"):
+        return cls(df[code_col], df[lat_col], df[lon_col])
+
+    def __len__(self):
+        return len(self._lookup)
+
+    def __contains__(self, code):
+        return self.get(code) is not None
+
+    def get(self, code):
+        """Return (lat, lon, row) for one code, or None when it is unknown"""
+        if not isinstance(code, str):
+            return None
+        return self._lookup.get(code.strip().upper())
+
+    def resolve(self, codes):
+        """Resolve a whole column of codes in one vectorized join"""
+        normalized = normalize_codes(codes)
+        positions = self._codes.get_indexer(normalized)
+        found = positions >= 0
+
+        # Append a sentinel slot so unresolved positions (-1) index NaN / -1.
+        lat = np.append(self._lats, np.nan)[positions]
+        lon = np.append(self._lons, np.nan)[positions]
+        row = np.append(self._rows, -1)[positions]
+        unknown = sorted(normalized[~found & normalized.notna().to_numpy()].unique())
+        return Resolved(lat, lon, row, unknown)
@@ -0,0 +1,271 @@
+"""Collision-free placement of tanker icons and labels.
+
+Tankers parked at one airport share its coordinates, and busy hubs sit
+close enough that their labels run into each other at dashboard zoom.
+``LabelPlacer`` lays the map out in screen pixels at the zoom it is drawn
+at: the fixed marks (fire, bases with their labels, distance labels) are
+reserved first, then every tanker's icon and label takes the nearest free
+slot on a grid around its airport, checked against a spatial hash of the
+boxes already placed. Airports are laid out nearest the fire first.
+
+Once an airport has no free slot left, its remaining tankers collapse into
+one ``+N`` badge. Layouts are cached per tanker-state hash, fixed marks,
+zoom and clustering choice.
+"""
+
+import collections
+import math
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from tankerwatch.core import frame_digest
+
+MAP_ZOOM = 7  # the zoom the dashboard map opens at
+TILE_PX = 512  # deck.gl world width in pixels at zoom 0
+ICON_SIZE_PX = 40  # deck.icon_layer draws icons get_size 4 x size_scale 10
+CHAR_WIDTH = 0.6  # average glyph width per px of font size
+PAD_PX = 2  # clearance kept around every box
+TEXT_PX = {"bases": 16, "tankers": 14, "distances": 20, "clusters": 14}
+SLOT_RINGS = 3  # slots tried up to this many boxes away from the airport
+HASH_CELL_PX = 64
+LAYOUT_CACHE_SIZE = 64
+
+
+class LabelLayout(NamedTuple):
+    """Placed tanker marks; ``tankers`` keeps the input index"""
+
+    tankers: pd.DataFrame  # LON_offset, LAT_offset, label_text, icon
+    clusters: pd.DataFrame  # lon, lat, text, count: one badge per crowded airport
+    digest: str  # hash of the inputs the layout was made from
+    cache_hit: bool = False  # whether this call was served from the cache
+
+    @property
+    def hidden(self):
+        """Tankers collapsed into badges"""
+        return int(self.clusters["count"].sum())
+
+
+# --------------------------
+# Screen geometry
+# --------------------------
+def to_pixels(lats, lons, zoom=MAP_ZOOM):
+    """Web Mercator world pixels (x east, y south) at ``zoom``"""
+    world = TILE_PX * 2.0**zoom
+    lat = np.radians(np.asarray(lats, dtype=float))
+    x = (np.asarray(lons, dtype=float) + 180) / 360 * world
+    y = (1 - np.log(np.tan(np.pi / 4 + lat / 2)) / np.pi) / 2 * world
+    return x, y
+
+
+def to_lonlat(x, y, zoom=MAP_ZOOM):
+    """Inverse of ``to_pixels``; returns (lons, lats)"""
+    world = TILE_PX * 2.0**zoom
+    lon = np.asarray(x, dtype=float) / world * 360 - 180
+    lat = np.degrees(
+        2 * np.arctan(np.exp(np.pi * (1 - 2 * np.asarray(y, dtype=float) / world)))
+        - np.pi / 2
+    )
+    return lon, lat
+
+
+def text_extent(texts, size):
+    """(widths, heights) in px of multi-line labels drawn at ``size`` px"""
+    lines = [str(text).split("\n") for text in texts]
+    width = np.array([max(map(len, parts)) for parts in lines], dtype=float)
+    height = np.array([len(parts) for parts in lines], dtype=float)
+    return width * size * CHAR_WIDTH, height * size
+
+
+def marker_boxes(x, y, texts, size, icon=True, baseline="top"):
+    """(n, 4) left, top, right, bottom px of an icon over its anchor plus label.
+
+    Matches ``deck.label_layer``: a ``top`` label hangs below the anchor, a
+    ``bottom`` label sits on it. Icons are anchored at their bottom edge.
+    """
+    width, height = text_extent(texts, size)
+    above = ICON_SIZE_PX if icon else 0
+    half = np.maximum(width, above) / 2 + PAD_PX
+    if baseline == "top":
+        top, bottom = y - above, y + height
+    else:
+        top, bottom = y - np.maximum(height, above), y
+    return np.column_stack(
+        np.broadcast_arrays(x - half, top - PAD_PX, x + half, bottom + PAD_PX)
+    )
+
+
+def slot_offsets(width, height, rings=SLOT_RINGS):
+    """Grid offsets of ``width`` x ``height`` slots around an anchor, nearest first"""
+    steps = np.arange(-rings, rings + 1)
+    i, j = (grid.ravel() for grid in np.meshgrid(steps, steps))
+    dx, dy = i * width, j * height
+    order = np.argsort(np.hypot(dx, dy), kind="stable")
+    return list(zip(dx[order].tolist(), dy[order].tolist()))
+
+
+class SpatialHash:
+    """Axis-aligned boxes bucketed by grid cell for overlap tests"""
+
+    def __init__(self, cell_px=HASH_CELL_PX):
+        self.cell_px = cell_px
+        self._cells = collections.defaultdict(list)
+
+    def _keys(self, box):
+        left, top, right, bottom = box
+        c = self.cell_px
+        for i in range(math.floor(left / c), math.floor(right / c) + 1):
+            for j in range(math.floor(top / c), math.floor(bottom / c) + 1):
+                yield i, j
+
+    def add(self, box):
+        for key in self._keys(box):
+            self._cells[key].append(box)
+
+    def overlaps(self, box):
+        left, top, right, bottom = box
+        for key in self._keys(box):
+            for other in self._cells.get(key, ()):
+                if (
+                    left < other[2]
+                    and other[0] < right
+                    and top < other[3]
+                    and other[1] < bottom
+                ):
+                    return True
+        return False
+
+    def place(self, x, y, box, slots):
+        """Reserve ``box`` (relative to ``x, y``) at the first free slot; None if full"""
+        left, top, right, bottom = box
+        for dx, dy in slots:
+            candidate = (x + dx + left, y + dy + top, x + dx + right, y + dy + bottom)
+            if not self.overlaps(candidate):
+                self.add(candidate)
+                return x + dx, y + dy
+        return None
+
+
+# --------------------------
+# Layout
+# --------------------------
+def place_labels(frames, zoom=MAP_ZOOM, cluster=True):
+    """Lay out ``frames.tankers`` (LON, LAT, label_text, icon) around the fixed marks.
+
+    ``frames`` is a ``core.LayerFrames``. Without ``cluster`` tankers that
+    find no free slot stay on their airport, overlapping.
+    """
+    occupied = SpatialHash()
+    fire_x, fire_y = to_pixels(frames.fire["lat"], frames.fire["lon"], zoom)
+    base_x, base_y = to_pixels(frames.bases["LAT"], frames.bases["LON"], zoom)
+    mid_x, mid_y = to_pixels(frames.distances["lat"], frames.distances["lon"], zoom)
+    for boxes in (
+        marker_boxes(fire_x, fire_y, [""] * len(fire_x), 0),
+        marker_boxes(base_x, base_y, frames.bases["label_text"], TEXT_PX["bases"]),
+        marker_boxes(
+            mid_x,
+            mid_y,
+            frames.distances["text"],
+            TEXT_PX["distances"],
+            icon=False,
+            baseline="bottom",
+        ),
+    ):
+        for box in boxes.tolist():
+            occupied.add(box)
+
+    tankers = frames.tankers
+    x, y = to_pixels(tankers["LAT"], tankers["LON"], zoom)
+    boxes = marker_boxes(0.0, 0.0, tankers["label_text"], TEXT_PX["tankers"])
+    anchors, group = np.unique(np.column_stack([x, y]), axis=0, return_inverse=True)
+    group = group.ravel()
+    if len(fire_x):
+        nearest_first = np.argsort(
+            np.hypot(anchors[:, 0] - fire_x[0], anchors[:, 1] - fire_y[0]),
+            kind="stable",
+        )
+    else:
+        nearest_first = np.arange(len(anchors))
+    members = np.argsort(group, kind="stable")
+    bounds = np.searchsorted(group[members], np.arange(len(anchors) + 1))
+
+    placed_x, placed_y = x.copy(), y.copy()
+    shown = np.ones(len(tankers), dtype=bool)
+    badges = []
+    for g in nearest_first.tolist():
+        rows = members[bounds[g] : bounds[g + 1]]
+        ax, ay = anchors[g].tolist()
+        sizes = boxes[rows, 2:] - boxes[rows, :2]
+        slots = slot_offsets(*sizes.max(axis=0).tolist())
+        hidden = 0
+        for row in rows.tolist():
+            spot = (
+                None if hidden else occupied.place(ax, ay, boxes[row].tolist(), slots)
+            )
+            if spot is None:
+                hidden += 1
+                shown[row] = not cluster
+            else:
+                placed_x[row], placed_y[row] = spot
+        if hidden and cluster:
+            text = f"+{hidden}"
+            width, height = text_extent([text], TEXT_PX["clusters"])
+            half_w, half_h = width[0] / 2 + PAD_PX, height[0] / 2 + PAD_PX
+            badge = (-half_w, -half_h, half_w, half_h)
+            spot = occupied.place(ax, ay, badge, slot_offsets(2 * half_w, 2 * half_h))
+            badges.append((*(spot or (ax, ay)), text, hidden))
+
+    lons, lats = to_lonlat(placed_x[shown], placed_y[shown], zoom)
+    badge_x, badge_y, texts, counts = (
+        map(list, zip(*badges)) if badges else ([], [], [], [])
+    )
+    badge_lons, badge_lats = to_lonlat(badge_x, badge_y, zoom)
+    return (
+        tankers.loc[shown, ["label_text", "icon"]].assign(
+            LON_offset=lons, LAT_offset=lats
+        )[["LON_offset", "LAT_offset", "label_text", "icon"]],
+        pd.DataFrame(
+            {
+                "lon": badge_lons,
+                "lat": badge_lats,
+                "text": texts,
+                "count": np.array(counts, dtype=int),
+            }
+        ),
+    )
+
+
+class LabelPlacer:
+    """LRU of tanker layouts keyed by the hash of everything they depend on.
+
+    Safe to share between threads; one instance per process is enough.
+    """
+
+    def __init__(self, cache_size=LAYOUT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self._layouts = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def layout(self, frames, zoom=MAP_ZOOM, cluster=True):
+        """The ``LabelLayout`` for ``core.LayerFrames`` drawn at ``zoom``"""
+        digest = frame_digest(
+            frames.fire, frames.bases, frames.distances, frames.tankers
+        )
+        key = (digest, zoom, cluster)
+        with self._lock:
+            layout = self._layouts.get(key)
+            if layout is not None:
+                self._layouts.move_to_end(key)
+                self.hits += 1
+                return layout._replace(cache_hit=True)
+        tankers, clusters = place_labels(frames, zoom, cluster)
+        layout = LabelLayout(tankers, clusters, f"{digest}:{zoom}:{int(cluster)}")
+        with self._lock:
+            self.misses += 1
+            self._layouts[key] = layout
+            while len(self._layouts) > self.cache_size:
+                self._layouts.popitem(last=False)
+        return layout
@@ -0,0 +1,187 @@
+"""Append-only, date-partitioned store of end-of-day tanker positions.
+
+Each EOD workbook lists tail numbers and types with one location column per
+date. ``PositionStore.ingest`` parses only workbooks it has not seen before
+(or whose content changed) and appends one columnar partition per date:
+
+    <store dir>/date=2025-07-07/<sha256[:16]>/<i>.npy
+
+Partitions are never rewritten. When a date arrives again from a different
+workbook the newest partition wins; ``manifest.json`` records them in
+ingest order. All partitions are memory-mapped into one date-sorted frame
+kept in memory, so "latest", "as of" and per-tanker history queries never
+touch a workbook.
+"""
+
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from tankerwatch.assets import ASSET_DIR
+from tankerwatch.data import TANKER_COLUMNS, eod_columns, header_date, read_only
+from tankerwatch.snapshots import CACHE_DIR, file_sha256, read_columns
+from tankerwatch.snapshots import read_manifest, read_workbook_columns
+from tankerwatch.snapshots import write_columns, write_manifest
+
+STORE_DIR = Path(
+    os.environ.get("TANKERWATCH_POSITIONS_DIR", CACHE_DIR.parent / "positions")
+)
+EOD_DIR = Path(os.environ.get("TANKERWATCH_EOD_DIR", ASSET_DIR))
+EOD_PATTERN = "eod_loc_*.xlsx"
+DATE_COLUMN = "Date"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+
+class PositionStore:
+    """Tanker positions by date, ingested incrementally from EOD workbooks.
+
+    Safe to share between threads; one instance per process is enough.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        manifest = read_manifest(self.root, MANIFEST)
+        if not manifest or manifest.get("version") != FORMAT_VERSION:
+            manifest = {"version": FORMAT_VERSION, "files": {}, "partitions": {}}
+        self._manifest = manifest
+        self._combined = None
+        self._as_of = {}  # date -> read-only frame, shared by every caller
+        self._lock = threading.RLock()
+
+    # --------------------------
+    # Ingest
+    # --------------------------
+    def ingest(self, directory=EOD_DIR, pattern=EOD_PATTERN):
+        """Ingest new or changed workbooks in ``directory``; returns the dates added"""
+        added = []
+        for path in sorted(Path(directory).glob(pattern)):
+            added += self.ingest_file(path)
+        return added
+
+    def ingest_file(self, path):
+        """Append one partition per dated column of ``path`` unless already ingested"""
+        path = Path(path).resolve()
+        stat = path.stat()
+        with self._lock:
+            files = self._manifest["files"]
+            seen = files.get(str(path))
+            if seen and (seen["mtime_ns"], seen["size"]) == (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                return []
+            sha = file_sha256(path)
+            record = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha}
+            if seen and seen["sha256"] == sha:
+                # Same content under a new mtime: remember it to skip re-hashing.
+                files[str(path)] = {**seen, **record}
+                write_manifest(self.root, self._manifest, MANIFEST)
+                return []
+
+            df = read_workbook_columns(path, eod_columns)
+            added = []
+            for column in [col for col in df.columns if header_date(col)]:
+                date = header_date(column).isoformat()
+                frame = pd.DataFrame(
+                    {
+                        "Tanker Number": df["TailNumber"],
+                        "Aircraft Type": df["Type"],
+                        "Airport": df[column],
+                    }
+                ).dropna(subset=["Tanker Number"])
+                entry = self._write_partition(date, sha, frame)
+                entry["source"] = str(path)
+                self._manifest["partitions"].setdefault(date, []).append(entry)
+                added.append(date)
+            files[str(path)] = {**record, "dates": added}
+            write_manifest(self.root, self._manifest, MANIFEST)
+            self._combined = None
+            self._as_of = {}
+            return added
+
+    def _write_partition(self, date, sha, frame):
+        relative = Path(f"date={date}") / sha[:16]
+        target = self.root / relative
+        if not target.exists():
+            target.parent.mkdir(exist_ok=True)
+            staging = Path(tempfile.mkdtemp(dir=target.parent, prefix=".tmp-"))
+            try:
+                write_columns(frame.astype(object), staging)
+                staging.rename(target)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        # Everything is written as text, so the kinds are known without reading.
+        kinds = {column: "string" for column in frame.columns}
+        return {"data": str(relative), "rows": len(frame), "kinds": kinds}
+
+    # --------------------------
+    # Queries
+    # --------------------------
+    def dates(self):
+        """Dates with positions, oldest first"""
+        with self._lock:
+            partitions = self._manifest["partitions"]
+            return [datetime.date.fromisoformat(d) for d in sorted(partitions)]
+
+    def combined(self):
+        """Every date's positions in one frame, sorted by date"""
+        with self._lock:
+            if self._combined is None:
+                frames = []
+                partitions = self._manifest["partitions"]
+                for date in sorted(partitions):
+                    newest = partitions[date][-1]
+                    frame = read_columns(self.root / newest["data"], newest["kinds"])
+                    frame.insert(0, DATE_COLUMN, pd.Timestamp(date))
+                    frames.append(frame)
+                columns = [DATE_COLUMN] + TANKER_COLUMNS
+                self._combined = (
+                    pd.concat(frames, ignore_index=True)
+                    if frames
+                    else pd.DataFrame(columns=columns)
+                )
+            return self._combined
+
+    def on(self, date):
+        """Positions reported on exactly ``date`` (empty when there is no sheet)"""
+        combined = self.combined()
+        rows = combined[combined[DATE_COLUMN] == pd.Timestamp(date)]
+        return rows[TANKER_COLUMNS].reset_index(drop=True)
+
+    def as_of(self, date=None):
+        """Each tanker's last reported position on or before ``date`` (None: latest).
+
+        Tankers in the most recent sheet come first, in sheet order, followed
+        by tankers last seen on earlier dates. The result is computed once
+        per date and returned read-only.
+        """
+        key = None if date is None else pd.Timestamp(date)
+        with self._lock:
+            if key not in self._as_of:
+                combined = self.combined()
+                if key is not None:
+                    combined = combined[combined[DATE_COLUMN] <= key]
+                latest = combined.iloc[::-1].drop_duplicates("Tanker Number")
+                newest = latest[DATE_COLUMN] == latest[DATE_COLUMN].max()
+                ordered = pd.concat([latest[newest].iloc[::-1], latest[~newest]])
+                self._as_of[key] = read_only(
+                    ordered[[DATE_COLUMN] + TANKER_COLUMNS].reset_index(drop=True)
+                )
+            return self._as_of[key]
+
+    def latest(self):
+        return self.as_of(None)
+
+    def history(self, tanker_number):
+        """Reported locations of one tanker, oldest first"""
+        combined = self.combined()
+        rows = combined[combined["Tanker Number"] == tanker_number]
+        return rows[[DATE_COLUMN, "Aircraft Type", "Airport"]].reset_index(drop=True)
@@ -0,0 +1,363 @@
+"""Local HTTP/JSON query service.
+
+Answers the dashboard's question for other dispatch tools without a browser:
+
+    POST /nearest  {"lat": 39.74, "lon": -121.84, "k": 3, "tankers": 3}
+    POST /nearest  {"fires": [{"lat": ..., "lon": ...}, ...], "k": 3}
+    GET  /nearest?lat=39.74&lon=-121.84&k=3&tankers=3
+    GET  /stats    request and batch latency percentiles
+    GET  /health
+
+Reference data and indexes stay resident in one ``Engine``. Requests that
+arrive within ``max_wait_ms`` of each other are micro-batched into a single
+``score_fires`` call; batches of at least ``pool_min_fires`` fires run on a
+process pool so one large request does not stall the small ones.
+"""
+
+import collections
+import concurrent.futures
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from tankerwatch import batch
+from tankerwatch.batch import _init_worker, score_fires
+from tankerwatch.core import Engine
+from tankerwatch.data import AIRPORT_FILE, TANKER_FILE
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_K = 25  # bases or tankers per fire
+MAX_FIRES = 100_000  # per request
+LATENCY_WINDOW = 10_000  # latencies kept for the percentiles
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class LatencyStats:
+    """Rolling window of latencies in milliseconds"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, ms):
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+
+    def summary(self):
+        with self._lock:
+            samples = np.array(self._samples)
+            count = self.count
+        if not len(samples):
+            return {"count": count}
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {
+            "count": count,
+            "p50_ms": round(p50, 3),
+            "p99_ms": round(p99, 3),
+            "max_ms": round(samples.max(), 3),
+        }
+
+
+def _score_in_worker(lats, lons, k, n_tankers):
+    return score_fires(batch._worker_engine, lats, lons, k, n_tankers, eta=True)
+
+
+class _Job:
+    __slots__ = ("lats", "lons", "k", "n_tankers", "future")
+
+    def __init__(self, lats, lons, k, n_tankers):
+        self.lats, self.lons = lats, lons
+        self.k, self.n_tankers = k, n_tankers
+        self.future = concurrent.futures.Future()
+
+
+class MicroBatcher:
+    """Coalesce concurrent queries into one vectorized ``score_fires`` call.
+
+    Each batch is scored with the largest ``k`` and tanker count asked for
+    and every job takes the leading columns it needs.
+    """
+
+    def __init__(
+        self,
+        engine,
+        max_batch=4096,
+        max_wait_ms=2.0,
+        workers=0,
+        pool_min_fires=20_000,
+        airport_path=AIRPORT_FILE,
+        tanker_path=TANKER_FILE,
+    ):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1e3
+        self.pool_min_fires = pool_min_fires
+        self.batch_latency = LatencyStats()
+        self.batched_fires = 0
+        self._queue = queue.SimpleQueue()
+        self._pool = None
+        if workers > 0:
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(airport_path, tanker_path),
+            )
+        self._thread = threading.Thread(
+            target=self._run, name="query-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, lats, lons, k, n_tankers):
+        job = _Job(lats, lons, k, n_tankers)
+        self._queue.put(job)
+        return job.future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            jobs, fires = [job], len(job.lats)
+            deadline = time.perf_counter() + self.max_wait
+            while fires < self.max_batch:
+                try:
+                    job = self._queue.get(
+                        timeout=max(0.0, deadline - time.perf_counter())
+                    )
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._queue.put(None)
+                    break
+                jobs.append(job)
+                fires += len(job.lats)
+            self._score(jobs, fires)
+
+    def _score(self, jobs, fires):
+        started = time.perf_counter()
+        lats = np.concatenate([job.lats for job in jobs])
+        lons = np.concatenate([job.lons for job in jobs])
+        k = max(job.k for job in jobs)
+        n_tankers = max(job.n_tankers for job in jobs)
+        try:
+            if self._pool is not None and fires >= self.pool_min_fires:
+                future = self._pool.submit(_score_in_worker, lats, lons, k, n_tankers)
+                future.add_done_callback(
+                    lambda done: self._pool_done(jobs, done, started)
+                )
+                return
+            scored = score_fires(self.engine, lats, lons, k, n_tankers, eta=True)
+        except Exception as error:
+            scored = error
+        self._finish(jobs, scored, started)
+
+    def _pool_done(self, jobs, done, started):
+        try:
+            scored = done.result()
+        except BaseException as error:  # includes cancellation on shutdown
+            scored = error
+        self._finish(jobs, scored, started)
+
+    def _finish(self, jobs, scored, started):
+        # Runs in a pool done-callback, where exceptions are swallowed, so
+        # every job must end up resolved or its handler waits forever.
+        try:
+            self.batch_latency.add((time.perf_counter() - started) * 1e3)
+            self.batched_fires += sum(len(job.lats) for job in jobs)
+            if isinstance(scored, BaseException):
+                raise scored
+            offset = 0
+            for job in jobs:
+                rows = scored.iloc[offset : offset + len(job.lats)]
+                job.future.set_result(fire_results(rows, job.k, job.n_tankers))
+                offset += len(job.lats)
+        except BaseException as error:
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(error)
+
+
+def _number(value):
+    return None if value is None or value != value else float(value)
+
+
+def fire_results(scored, k, n_tankers):
+    """``score_fires`` rows as JSON-ready dicts, one per fire"""
+    columns = scored.columns
+    bases = [
+        (scored[f"base_{j}_icao"].tolist(), scored[f"base_{j}_nm"].tolist())
+        for j in range(1, k + 1)
+        if f"base_{j}_icao" in columns
+    ]
+    tankers = [
+        (
+            scored[f"tanker_{j}"].tolist(),
+            scored[f"tanker_{j}_airport"].tolist(),
+            scored[f"tanker_{j}_nm"].tolist(),
+            scored[f"tanker_{j}_eta_min"].tolist(),
+        )
+        for j in range(1, n_tankers + 1)
+        if f"tanker_{j}" in columns
+    ]
+    results = []
+    for i in range(len(scored)):
+        results.append(
+            {
+                "bases": [
+                    {"icao": icao[i], "nm": _number(nm[i])}
+                    for icao, nm in bases
+                    if icao[i] is not None
+                ],
+                "tankers": [
+                    {
+                        "tanker": tail[i],
+                        "airport": airport[i],
+                        "nm": _number(nm[i]),
+                        "eta_min": _number(eta[i]),
+                    }
+                    for tail, airport, nm, eta in tankers
+                    if tail[i] is not None
+                ],
+            }
+        )
+    return results
+
+
+def _count_param(query, name, default, low, high):
+    value = query.get(name, default)
+    try:
+        count = int(value)
+        if count != float(value):  # int() would truncate 2.5 silently
+            raise ValueError(value)
+    except (TypeError, ValueError, OverflowError):
+        raise BadRequest(f"'{name}' must be an integer, got {value!r}") from None
+    if not low <= count <= high:
+        raise BadRequest(f"'{name}' must be {low} to {high}, got {count}")
+    return count
+
+
+def parse_query(query):
+    """(lats, lons, k, n_tankers, batched) from a request dict"""
+    if not isinstance(query, dict):
+        raise BadRequest("expected a JSON object")
+    batched = "fires" in query
+    fires = query["fires"] if batched else [query]
+    if not isinstance(fires, list) or not 0 < len(fires) <= MAX_FIRES:
+        raise BadRequest(f"'fires' must be a list of 1 to {MAX_FIRES} locations")
+    try:
+        lats = np.array([fire["lat"] for fire in fires], dtype=float)
+        lons = np.array([fire["lon"] for fire in fires], dtype=float)
+    except (KeyError, TypeError, ValueError):
+        raise BadRequest("each fire needs numeric 'lat' and 'lon'") from None
+    if not (np.isfinite(lats).all() and np.isfinite(lons).all()):
+        raise BadRequest("'lat' and 'lon' must be finite")
+    if (np.abs(lats) > 90).any() or (np.abs(lons) > 180).any():
+        raise BadRequest("'lat' must be within ±90 and 'lon' within ±180")
+    k = _count_param(query, "k", 3, 1, MAX_K)
+    n_tankers = _count_param(query, "tankers", 3, 0, MAX_K)
+    return lats, lons, k, n_tankers, batched
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "TankerWatch"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif url.path == "/stats":
+            self._send(200, self.server.stats())
+        elif url.path == "/nearest":
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            self._nearest(params)
+        else:
+            self._send(404, {"error": f"no such endpoint: {url.path}"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            # The body's extent is unknown, so the connection cannot be reused.
+            self.close_connection = True
+            self._send(400, {"error": "Content-Length must be a non-negative integer"})
+            return
+        body = self.rfile.read(length)
+        if urlsplit(self.path).path != "/nearest":
+            self._send(404, {"error": f"no such endpoint: {self.path}"})
+            return
+        try:
+            query = json.loads(body or b"null")
+        except ValueError:
+            self._send(400, {"error": "body is not valid JSON"})
+            return
+        self._nearest(query)
+
+    def _nearest(self, query):
+        started = time.perf_counter()
+        try:
+            lats, lons, k, n_tankers, batched = parse_query(query)
+        except BadRequest as error:
+            self._send(400, {"error": str(error)})
+            return
+        try:
+            results = self.server.batcher.submit(lats, lons, k, n_tankers).result()
+        except Exception as error:
+            self._send(500, {"error": f"{type(error).__name__}: {error}"})
+            return
+        self._send(200, {"fires": results} if batched else results[0])
+        self.server.latency.add((time.perf_counter() - started) * 1e3)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class QueryServer(ThreadingHTTPServer):
+    """HTTP front end over one resident ``Engine`` and its ``MicroBatcher``"""
+
+    daemon_threads = True
+
+    def __init__(self, address=(HOST, PORT), engine=None, **batching):
+        self.engine = engine or Engine.from_files()
+        self.batcher = MicroBatcher(self.engine, **batching)
+        self.latency = LatencyStats()
+        super().__init__(address, _Handler)
+
+    def stats(self):
+        batches = self.batcher.batch_latency.summary()
+        if batches["count"]:
+            batches["fires_per_batch"] = round(
+                self.batcher.batched_fires / batches["count"], 1
+            )
+        return {"requests": self.latency.summary(), "batches": batches}
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
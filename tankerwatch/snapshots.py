@@ -0,0 +1,215 @@
+"""Columnar on-disk snapshots of the Excel inputs.
+
+The first load of a workbook streams it through openpyxl in read-only mode,
+keeps only the requested columns and writes each column as a ``.npy`` file.
+Later loads read those files instead of parsing the workbook again: numeric
+and date columns stay memory-mapped, while text columns are decoded into
+pandas strings, which copies them.
+
+Snapshots live under ``<cache dir>/<source key>/<content hash>/``. The
+``current.json`` manifest next to them records the source path, mtime, size
+and SHA-256 of the workbook. A changed mtime or size triggers a hash check,
+so touching a file re-validates the snapshot without rebuilding it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tankerwatch.assets import ASSET_DIR
+
+CACHE_DIR = Path(
+    os.environ.get("TANKERWATCH_CACHE_DIR", ASSET_DIR / ".cache" / "snapshots")
+)
+MANIFEST = "current.json"
+FORMAT_VERSION = 1
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_workbook_columns(path, columns=None):
+    """Stream the first sheet of a workbook, keeping only the selected columns.
+
+    ``columns`` is a list of header names or a callable that receives the
+    header names (as strings) and returns the ones to keep. ``None`` keeps
+    every column.
+    """
+    # openpyxl takes ~0.2 s to import and is only needed to (re)build a snapshot.
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name) for name in next(rows, ())]
+        wanted = columns(header) if callable(columns) else columns
+        wanted = header if wanted is None else list(wanted)
+        missing = [name for name in wanted if name not in header]
+        if missing:
+            raise KeyError(f"{path}: missing columns {missing}")
+        positions = [header.index(name) for name in wanted]
+        records = [
+            [row[i] if i < len(row) else None for i in positions]
+            for row in rows
+            if any(value is not None for value in row)
+        ]
+    finally:
+        workbook.close()
+    return pd.DataFrame.from_records(records, columns=wanted)
+
+
+def _columns_spec(columns):
+    if callable(columns):
+        # A selector's output depends on code the manifest cannot see, so a
+        # snapshot keyed on it could go stale; snapshot the raw columns and
+        # select after loading instead.
+        raise TypeError("snapshots take a list of column names or None")
+    return None if columns is None else list(columns)
+
+
+def _snapshot_root(source, cache_dir):
+    key = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:12]
+    return Path(cache_dir) / f"{source.stem}-{key}"
+
+
+def write_columns(df, target):
+    """Write each column of ``df`` as ``<i>.npy`` in ``target``; returns their kinds"""
+    kinds = {}
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        if series.dtype.kind in "biuf":
+            np.save(target / f"{i}.npy", series.to_numpy())
+            kinds[name] = "numeric"
+        elif series.dtype.kind == "M":
+            np.save(target / f"{i}.npy", series.to_numpy(dtype="datetime64[ns]"))
+            kinds[name] = "datetime"
+        else:
+            # Fixed-width unicode arrays can be memory-mapped, unlike objects.
+            missing = series.isna().to_numpy()
+            values = np.array(
+                ["" if m else str(v) for v, m in zip(series, missing)], dtype=str
+            )
+            np.save(target / f"{i}.npy", values)
+            np.save(target / f"{i}.mask.npy", missing)
+            kinds[name] = "string"
+    return kinds
+
+
+def read_columns(target, kinds):
+    """Columns written by ``write_columns`` back as a DataFrame.
+
+    Numeric and datetime columns are views of the memory-mapped files (pages
+    are read on first touch and shared between processes). Text columns
+    cannot be, since pandas strings are objects or Arrow buffers, so they
+    are decoded into memory.
+    """
+    data = {}
+    for i, (name, kind) in enumerate(kinds.items()):
+        values = np.load(target / f"{i}.npy", mmap_mode="r")
+        if kind == "string":
+            missing = np.load(target / f"{i}.mask.npy")
+            data[name] = pd.Series(values, dtype="str").mask(missing)
+        else:
+            data[name] = values
+    # copy=False keeps each mapped column as its own block instead of
+    # consolidating (copying) them; copy-on-write guards the read-only map.
+    return pd.DataFrame(data, copy=False)
+
+
+def build_snapshot(source, columns=None, cache_dir=CACHE_DIR):
+    """Parse ``source`` and (re)write its snapshot; returns the manifest"""
+    spec = _columns_spec(columns)
+    source = Path(source).resolve()
+    root = _snapshot_root(source, cache_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    stat = source.stat()
+    sha = file_sha256(source)
+    df = read_workbook_columns(source, columns)
+
+    target = root / sha[:16]
+    staging = Path(tempfile.mkdtemp(dir=root, prefix=".tmp-"))
+    try:
+        kinds = write_columns(df, staging)
+        shutil.rmtree(target, ignore_errors=True)
+        staging.rename(target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "source": str(source),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha,
+        "columns_spec": spec,
+        "data": target.name,
+        "kinds": kinds,
+        "rows": len(df),
+    }
+    write_manifest(root, manifest)
+    for stale in root.iterdir():
+        if stale.is_dir() and stale != target and not stale.name.startswith("."):
+            shutil.rmtree(stale, ignore_errors=True)
+    return manifest
+
+
+def write_manifest(root, manifest, name=MANIFEST):
+    """Atomically replace the JSON manifest ``root/name``"""
+    fd, tmp = tempfile.mkstemp(dir=root, prefix=".manifest-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, root / name)
+
+
+def read_manifest(root, name=MANIFEST):
+    """The JSON manifest ``root/name``, or None when missing or unreadable"""
+    try:
+        with open(root / name) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_is_current(manifest, source, columns):
+    """Check a manifest against the source file, re-hashing only when needed"""
+    if (
+        not manifest
+        or manifest.get("version") != FORMAT_VERSION
+        or manifest.get("columns_spec") != _columns_spec(columns)
+    ):
+        return False
+    stat = source.stat()
+    if (stat.st_mtime_ns, stat.st_size) == (manifest["mtime_ns"], manifest["size"]):
+        return True
+    return file_sha256(source) == manifest["sha256"]
+
+
+def load_snapshot(source, columns=None, cache_dir=CACHE_DIR):
+    """Load a workbook through its snapshot, rebuilding it when the source changed"""
+    source = Path(source).resolve()
+    root = _snapshot_root(source, cache_dir)
+    manifest = read_manifest(root)
+    if snapshot_is_current(manifest, source, columns):
+        stat = source.stat()
+        if (stat.st_mtime_ns, stat.st_size) != (manifest["mtime_ns"], manifest["size"]):
+            # Same content under a new mtime: remember it to skip re-hashing.
+            manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            write_manifest(root, manifest)
+        try:
+            return read_columns(root / manifest["data"], manifest["kinds"])
+        except OSError:
+            pass
+    manifest = build_snapshot(source, columns, cache_dir)
+    return read_columns(root / manifest["data"], manifest["kinds"])
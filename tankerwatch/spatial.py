@@ -0,0 +1,215 @@
+"""k-d tree over unit-sphere vectors for nearest-base queries.
+
+Points are stored as 3-D unit vectors, where straight-line (chord) distance
+is monotonic in great-circle distance. The tree answers k-nearest and
+within-radius queries on the sphere; ``BaseTree`` then refines the small
+candidate set with the exact WGS-84 distance so rankings match a full
+geodesic sort.
+"""
+
+import heapq
+
+import numpy as np
+
+from tankerwatch.geodesy import (
+    EARTH_RADIUS_KM,
+    HAVERSINE_MAX_REL_ERROR,
+    KM_PER_NM,
+    distances_nm,
+    haversine_nm,
+    vincenty_nm,
+)
+
+
+def to_unit_vectors(lats, lons):
+    """Convert degrees latitude/longitude to an (n, 3) array of unit vectors"""
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def nm_to_chord(nm):
+    """Chord length on the unit sphere for a great-circle distance in nm"""
+    angle = np.minimum(nm * KM_PER_NM / EARTH_RADIUS_KM, np.pi)
+    return 2 * np.sin(angle / 2)
+
+
+def chord_to_nm(chord):
+    """Great-circle distance in nm for a chord length on the unit sphere"""
+    angle = 2 * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+    return angle * EARTH_RADIUS_KM / KM_PER_NM
+
+
+class KDTree:
+    """Static k-d tree with per-node bounding boxes.
+
+    Nodes are stored in flat arrays; ``order`` holds the point indices so
+    that every node covers a contiguous ``order[start:end]`` slice.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        self.points = np.asarray(points, dtype=float)
+        self.order = np.arange(len(self.points))
+        self.leaf_size = leaf_size
+        self._start, self._end, self._left, self._right = [], [], [], []
+        self._lo, self._hi = [], []
+        if len(self.points):
+            self._build(0, len(self.points))
+        self._lo = np.array(self._lo).reshape(-1, 3)
+        self._hi = np.array(self._hi).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, start, end):
+        node = len(self._start)
+        block = self.points[self.order[start:end]]
+        lo, hi = block.min(axis=0), block.max(axis=0)
+        self._start.append(start)
+        self._end.append(end)
+        self._lo.append(lo)
+        self._hi.append(hi)
+        self._left.append(-1)
+        self._right.append(-1)
+        if end - start > self.leaf_size:
+            dim = int(np.argmax(hi - lo))
+            mid = (end - start) // 2
+            split = np.argpartition(block[:, dim], mid)
+            self.order[start:end] = self.order[start:end][split]
+            self._left[node] = self._build(start, start + mid)
+            self._right[node] = self._build(start + mid, end)
+        return node
+
+    def _box_distance(self, node, point):
+        gap = np.maximum(self._lo[node] - point, 0) + np.maximum(
+            point - self._hi[node], 0
+        )
+        return float(np.sqrt(gap @ gap))
+
+    def _leaf_distances(self, node, point):
+        idx = self.order[self._start[node] : self._end[node]]
+        return idx, np.linalg.norm(self.points[idx] - point, axis=1)
+
+    def query(self, point, k):
+        """Return (indices, distances) of the k nearest points, nearest first"""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=int), np.empty(0)
+        best = []  # max-heap of (-distance, index)
+        frontier = [(0.0, 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if self._left[node] < 0:
+                for i, d in zip(*self._leaf_distances(node, point)):
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, i))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, i))
+                continue
+            for child in (self._left[node], self._right[node]):
+                heapq.heappush(frontier, (self._box_distance(child, point), child))
+        best.sort(reverse=True)
+        return (
+            np.array([i for _, i in best], dtype=int),
+            np.array([-d for d, _ in best]),
+        )
+
+    def query_radius(self, point, radius):
+        """Return indices of all points within ``radius`` of ``point``"""
+        if not len(self):
+            return np.empty(0, dtype=int)
+        found = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance(node, point) > radius:
+                continue
+            if self._left[node] < 0:
+                idx, dist = self._leaf_distances(node, point)
+                found.append(idx[dist <= radius])
+            else:
+                stack.extend((self._left[node], self._right[node]))
+        return np.concatenate(found) if found else np.empty(0, dtype=int)
+
+
+class BaseTree:
+    """Nearest-base queries with exact geodesic refinement.
+
+    Results are positional indices into the ``lats``/``lons`` arrays the
+    tree was built from, together with their WGS-84 distances in nm.
+    """
+
+    def __init__(self, lats, lons, leaf_size=16):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.tree = KDTree(to_unit_vectors(self.lats, self.lons), leaf_size)
+
+    def __len__(self):
+        return len(self.tree)
+
+    def _refine(self, location, candidates):
+        exact = distances_nm(location, self.lats[candidates], self.lons[candidates])
+        ranked = np.argsort(exact, kind="stable")
+        return candidates[ranked], exact[ranked]
+
+    def nearest(self, location, k=3):
+        """Return (positions, distances_nm) of the k nearest bases, nearest first"""
+        point = to_unit_vectors(*location)[0]
+        _, chords = self.tree.query(point, k)
+        if not len(chords):
+            return np.empty(0, dtype=int), np.empty(0)
+        # Any base that beats the k-th spherical candidate on the ellipsoid
+        # lies within this widened spherical radius.
+        slack = (1 + HAVERSINE_MAX_REL_ERROR) / (1 - HAVERSINE_MAX_REL_ERROR)
+        radius = nm_to_chord(chord_to_nm(chords[-1]) * slack) + 1e-12
+        positions, distances = self._refine(
+            location, self.tree.query_radius(point, radius)
+        )
+        return positions[:k], distances[:k]
+
+    def nearest_many(self, lats, lons, k=3, block_cells=2_000_000):
+        """k nearest bases for many locations at once.
+
+        Locations are processed in blocks with a vectorized spherical
+        prefilter, so this suits batch jobs better than calling ``nearest``
+        per location. Returns (positions, distances_nm) arrays of shape
+        (n, k); slots without a base hold -1 and NaN.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        k = min(k, len(self))
+        positions = np.full((len(lats), k), -1)
+        distances = np.full((len(lats), k), np.nan)
+        if not k:
+            return positions, distances
+        slack = (1 + HAVERSINE_MAX_REL_ERROR) / (1 - HAVERSINE_MAX_REL_ERROR)
+        block = max(1, block_cells // len(self))
+        for start in range(0, len(lats), block):
+            lat = lats[start : start + block, None]
+            lon = lons[start : start + block, None]
+            sphere = haversine_nm(lat, lon, self.lats, self.lons)
+            kth = np.partition(sphere, k - 1, axis=1)[:, k - 1 : k]
+            rows, cols = np.nonzero(sphere <= kth * slack + 1e-9)
+            exact = np.full(sphere.shape, np.inf)
+            exact[rows, cols] = vincenty_nm(
+                lat[rows, 0], lon[rows, 0], self.lats[cols], self.lons[cols]
+            )
+            order = np.argsort(exact, axis=1, kind="stable")[:, :k]
+            best = np.take_along_axis(exact, order, axis=1)
+            found = np.isfinite(best)
+            positions[start : start + block] = np.where(found, order, -1)
+            distances[start : start + block] = np.where(found, best, np.nan)
+        return positions, distances
+
+    def within(self, location, radius_nm):
+        """Return (positions, distances_nm) of all bases within ``radius_nm``"""
+        point = to_unit_vectors(*location)[0]
+        radius = nm_to_chord(radius_nm / (1 - HAVERSINE_MAX_REL_ERROR)) + 1e-12
+        positions, distances = self._refine(
+            location, self.tree.query_radius(point, radius)
+        )
+        keep = distances <= radius_nm
+        return positions[keep], distances[keep]
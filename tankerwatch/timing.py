@@ -0,0 +1,108 @@
+"""Per-stage timing spans for dashboard reruns.
+
+    timings = Timings(scope="app")
+    with timings.span("nearest_bases", rows=len(bases)) as counters:
+        ...
+        counters["bytes"] = len(payload)
+    timings.finish()
+
+A disabled ``Timings`` hands out one shared no-op span, so an instrumented
+stage costs a method call when nobody is looking at the numbers.
+"""
+
+import datetime
+import json
+import os
+import time
+
+TIMINGS_FILE = os.environ.get("TANKERWATCH_TIMINGS_FILE")  # append runs as JSONL
+
+
+class _Counters(dict):
+    """Counters for a disabled span: writes are dropped"""
+
+    def __setitem__(self, key, value):
+        pass
+
+
+class _NullSpan:
+    def __enter__(self):
+        return _Counters()
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("timings", "name", "counters", "start")
+
+    def __init__(self, timings, name, counters):
+        self.timings, self.name, self.counters = timings, name, counters
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.counters
+
+    def __exit__(self, *exc):
+        self.timings.record(
+            self.name, self.start, time.perf_counter() - self.start, self.counters
+        )
+        return False
+
+
+class Timings:
+    """Stage spans and counters for one run of the script or a fragment"""
+
+    def __init__(self, enabled=True, scope="app"):
+        self.enabled = enabled
+        self.scope = scope
+        self.stages = []
+        self.finished = False
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self._start = time.perf_counter()
+        self.total_ms = None
+
+    def span(self, name, **counters):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, counters)
+
+    def record(self, name, start, seconds, counters=None):
+        self.stages.append(
+            {
+                "stage": name,
+                "offset_ms": (start - self._start) * 1e3,
+                "ms": seconds * 1e3,
+                **(counters or {}),
+            }
+        )
+
+    def finish(self):
+        self.finished = True
+        self.total_ms = (time.perf_counter() - self._start) * 1e3
+        return self
+
+    def as_dict(self):
+        return {
+            "scope": self.scope,
+            "started": self.started_at.isoformat(),
+            "total_ms": self.total_ms,
+            "stages": self.stages,
+        }
+
+
+NULL_TIMINGS = Timings(enabled=False)
+
+
+def to_jsonl(runs):
+    """Runs as JSON lines, one ``Timings.as_dict()`` per line"""
+    return "".join(json.dumps(run.as_dict()) + "\n" for run in runs)
+
+
+def append_jsonl(runs, path=TIMINGS_FILE):
+    if path:
+        with open(path, "a") as f:
+            f.write(to_jsonl(runs))
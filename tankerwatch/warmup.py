@@ -0,0 +1,126 @@
+"""Cold-start warm-up and process-wide resources.
+
+Streamlit runs ``app.py`` only when a browser connects, so without help the
+first dispatcher after a restart pays for loading snapshots, building
+indexes, encoding icons and every first-time computation. ``warm_up`` does
+that work up front, and ``resource`` keeps the results once per process
+where the app's loaders find them:
+
+    python -m tankerwatch app      # warm up, then start Streamlit in-process
+    python -m tankerwatch warmup   # build on-disk snapshots and report timings
+
+Under a plain ``streamlit run app.py`` the first script run starts the same
+warm-up on a background thread (``TANKERWATCH_WARMUP=0`` turns it off).
+``STARTUP`` holds the warm-up spans and ``COLD_START`` the import time and
+time to first render.
+"""
+
+import importlib
+import os
+import threading
+
+from tankerwatch.timing import Timings
+
+WARMUP_ENABLED = os.environ.get("TANKERWATCH_WARMUP", "1") != "0"
+HOT_MODULES = (
+    "pandas",
+    "pydeck",
+    "tankerwatch.core",
+    "tankerwatch.deck",
+    "tankerwatch.fleet",
+    "tankerwatch.positions",
+    "tankerwatch.coverage",
+    "tankerwatch.dispatch",
+)
+
+STARTUP = Timings(scope="startup")
+COLD_START = {}  # first value wins: import_ms, first_render_ms
+
+_resources = {}
+_lock = threading.RLock()  # factories may ask for other resources
+_thread = None
+
+
+def resource(name, factory):
+    """The process-wide object ``name``, built by ``factory`` on first use"""
+    with _lock:
+        if name not in _resources:
+            _resources[name] = factory()
+        return _resources[name]
+
+
+def note(name, value):
+    """Record a cold-start measurement; later values for ``name`` are ignored"""
+    COLD_START.setdefault(name, value)
+
+
+def engine():
+    from tankerwatch.core import Engine
+
+    return resource("engine", Engine.from_files)
+
+
+def positions():
+    from tankerwatch.positions import PositionStore
+
+    return resource("positions", PositionStore)
+
+
+def coverage_grid():
+    from tankerwatch.coverage import CoverageGrid
+
+    return resource("coverage", lambda: CoverageGrid(engine().base_tree))
+
+
+def warm_up(locations=(), k=3, coverage=True, mapbox_api_key=None):
+    """Build the shared resources and prime their caches; returns ``STARTUP``.
+
+    ``locations`` prime the nearest-base cache and, with ``mapbox_api_key``,
+    the deck cache for the default tanker positions, so those views render
+    from cache.
+    """
+    timings = STARTUP
+    with timings.span("imports", modules=len(HOT_MODULES)):
+        for name in HOT_MODULES:
+            importlib.import_module(name)
+    from tankerwatch.assets import ICON_FILES, load_icon
+    from tankerwatch.data import TANKER_COLUMNS
+    from tankerwatch.deck import cached_deck
+    from tankerwatch.fleet import FleetState
+
+    with timings.span("engine") as counters:
+        counters["bases"] = len(engine().bases)
+    with timings.span("positions") as counters:
+        store = positions()
+        counters["new_days"] = len(store.ingest())
+        dates = store.dates()
+        for date in dates:
+            store.as_of(date)
+    with timings.span("icons", icons=len(ICON_FILES)):
+        for key in ICON_FILES:
+            load_icon(key)
+
+    tankers = store.as_of(dates[-1] if dates else None)[TANKER_COLUMNS]
+    placed = FleetState(tankers, engine().icao_index).placed()
+    with timings.span("nearest_cache", locations=len(locations)):
+        closest = [engine().nearest_bases(location, k) for location in locations]
+    if mapbox_api_key:
+        with timings.span("decks", locations=len(locations)):
+            for location, bases in zip(locations, closest):
+                cached_deck(location, bases, placed, mapbox_api_key)
+    if coverage:
+        with timings.span("coverage") as counters:
+            coverage_grid().coverage(placed, counters)
+    return timings.finish()
+
+
+def start_background(**kwargs):
+    """Run ``warm_up`` on a daemon thread once per process (no-op if done)"""
+    global _thread
+    with _lock:
+        if not WARMUP_ENABLED or STARTUP.finished or _thread is not None:
+            return
+        _thread = threading.Thread(
+            target=warm_up, kwargs=kwargs, name="warm-up", daemon=True
+        )
+        _thread.start()
@@ -0,0 +1,57 @@
+"""NearestCache answers must equal an uncached brute-force geodesic sort"""
+
+import numpy as np
+import pytest
+
+from tankerwatch.cache import NearestCache
+from tankerwatch.geodesy import distances_nm
+from tankerwatch.spatial import BaseTree
+
+
+@pytest.fixture(scope="module")
+def bases():
+    rng = np.random.default_rng(12)
+    return rng.uniform(31, 49, 400), rng.uniform(-125, -102, 400)
+
+
+def brute_force(bases, location, k):
+    distances = distances_nm(location, *bases)
+    order = np.argsort(distances, kind="stable")[:k]
+    return order, distances[order]
+
+
+def queries(precision_deg, n=150):
+    """Random points, plus points just either side of cell boundaries"""
+    rng = np.random.default_rng(7)
+    lats, lons = rng.uniform(30, 50, n), rng.uniform(-126, -101, n)
+    edge_lats = np.round(lats / precision_deg) * precision_deg
+    edge_lons = np.round(lons / precision_deg) * precision_deg
+    nudge = rng.choice([-1e-9, 0.0, 1e-9], size=(2, n))
+    return np.concatenate([lats, edge_lats + nudge[0]]), np.concatenate(
+        [lons, edge_lons + nudge[1]]
+    )
+
+
+@pytest.mark.parametrize("precision_deg", [0.05, 0.5])
+@pytest.mark.parametrize("k", [1, 3, 10])
+def test_cached_matches_brute_force(bases, precision_deg, k):
+    tree = BaseTree(*bases)
+    cache = NearestCache(tree, precision_deg=precision_deg)
+    for _ in range(2):  # cold, then served from the cache
+        for location in zip(*queries(precision_deg)):
+            positions, distances = cache.nearest(location, k)
+            expected, expected_nm = brute_force(bases, location, k)
+            assert positions.tolist() == expected.tolist()
+            np.testing.assert_allclose(distances, expected_nm, rtol=1e-9)
+    assert cache.hits > 0
+
+
+def test_matches_base_tree(bases):
+    tree = BaseTree(*bases)
+    cache = NearestCache(tree, precision_deg=0.05, maxsize=8)
+    for location in zip(*queries(0.05, n=100)):
+        positions, distances = cache.nearest(location, 5)
+        tree_positions, tree_distances = tree.nearest(location, 5)
+        assert positions.tolist() == tree_positions.tolist()
+        np.testing.assert_allclose(distances, tree_distances, rtol=1e-9)
+    assert cache.stats()["evictions"] > 0
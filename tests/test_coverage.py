@@ -0,0 +1,93 @@
+"""CoverageGrid's incremental rasters must equal a brute-force minimum"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tankerwatch.coverage import CoverageGrid
+from tankerwatch.eta import PerformanceTable, eta_minutes
+from tankerwatch.geodesy import vincenty_nm
+from tankerwatch.spatial import BaseTree
+
+BOUNDS = (36.0, 42.0, -122.0, -114.0)
+TYPES = ["C-130", "BAE 146", "RJ85", "DC-10", "Mystery Jet"]
+
+
+@pytest.fixture(scope="module")
+def tree():
+    rng = np.random.default_rng(5)
+    return BaseTree(rng.uniform(35, 43, 40), rng.uniform(-123, -113, 40))
+
+
+def random_tankers(rng, n):
+    # Tankers share a few airports, so sources get shared and then split.
+    airports = rng.uniform([35, -123], [43, -113], size=(6, 2))
+    at = rng.integers(len(airports), size=n)
+    return pd.DataFrame(
+        {
+            "LAT": airports[at, 0],
+            "LON": airports[at, 1],
+            "Aircraft Type": rng.choice(TYPES, n),
+        }
+    )
+
+
+def brute_force(grid, tree, placed):
+    """(soonest ETA, nearest tanker NM, nearest base NM) for every cell"""
+    cells = (grid.lats[:, None], grid.lons[:, None])
+    base_nm = vincenty_nm(*cells, tree.lats[None, :], tree.lons[None, :]).min(axis=1)
+    if not len(placed):
+        return np.full(len(grid.lats), np.inf), np.full(len(grid.lats), np.inf), base_nm
+    nm = vincenty_nm(
+        *cells, placed["LAT"].to_numpy()[None, :], placed["LON"].to_numpy()[None, :]
+    )
+    performance = PerformanceTable().resolve(placed["Aircraft Type"])
+    eta = eta_minutes(nm, performance.cruise_kt, performance.spinup_min)
+    return eta.min(axis=1), nm.min(axis=1), base_nm
+
+
+def assert_matches(grid, tree, placed, stats=None):
+    raster = grid.coverage(placed, stats)
+    eta, nm, base_nm = brute_force(grid, tree, placed)
+    for metric, expected in (
+        ("tanker_eta", eta),
+        ("tanker_nm", nm),
+        ("base_nm", base_nm),
+    ):
+        np.testing.assert_allclose(
+            raster.values[metric].ravel(), expected, rtol=1e-5, err_msg=metric
+        )
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_updates_match_brute_force(tree, seed):
+    rng = np.random.default_rng(seed)
+    grid = CoverageGrid(tree, bounds=BOUNDS, step_deg=0.25)
+    placed = random_tankers(rng, 12)
+    assert_matches(grid, tree, placed)
+    for _ in range(15):
+        action = rng.choice(["add", "move", "remove", "retype"])
+        if action == "add":
+            placed = pd.concat([placed, random_tankers(rng, 2)], ignore_index=True)
+        elif action == "move" and len(placed):
+            i = rng.integers(len(placed))
+            placed.loc[i, ["LAT", "LON"]] = rng.uniform([35, -123], [43, -113])
+        elif action == "remove" and len(placed):
+            placed = placed.drop(index=placed.index[rng.integers(len(placed))])
+            placed = placed.reset_index(drop=True)
+        elif action == "retype" and len(placed):
+            placed.loc[rng.integers(len(placed)), "Aircraft Type"] = rng.choice(TYPES)
+        assert_matches(grid, tree, placed)
+
+
+def test_remove_every_source_and_rebuild(tree):
+    rng = np.random.default_rng(9)
+    grid = CoverageGrid(tree, bounds=BOUNDS, step_deg=0.5)
+    placed = random_tankers(rng, 8)
+    assert_matches(grid, tree, placed)
+    assert_matches(grid, tree, placed.iloc[:0])
+    # A state seen before comes back from the raster cache, unchanged.
+    stats = {}
+    assert_matches(grid, tree, placed, stats)
+    assert stats == {"cache_hit": True, "cells": 0}
+    assert_matches(grid, tree, random_tankers(rng, 5))
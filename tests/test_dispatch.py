@@ -0,0 +1,78 @@
+"""linear_assignment against brute force over every possible matching"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from tankerwatch.dispatch import linear_assignment
+
+
+def brute_force(cost):
+    """Minimum total over every matching of the smaller side; inf if none"""
+    n, m = cost.shape
+    if n <= m:
+        totals = (
+            cost[np.arange(n), cols].sum()
+            for cols in itertools.permutations(range(m), n)
+        )
+    else:
+        totals = (
+            cost[rows, np.arange(m)].sum()
+            for rows in itertools.permutations(range(n), m)
+        )
+    return min(totals)
+
+
+def check(cost):
+    rows, cols = linear_assignment(cost)
+    assert len(rows) == len(cols) == min(cost.shape)
+    assert list(rows) == sorted(rows)
+    assert len(set(rows)) == len(rows) and len(set(cols)) == len(cols)
+    assert cost[rows, cols].sum() == pytest.approx(brute_force(cost))
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (3, 3), (5, 5), (2, 6), (6, 2), (4, 7)])
+def test_random_matrices(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(40):
+        check(rng.uniform(0, 100, shape))
+
+
+@pytest.mark.parametrize("shape", [(4, 4), (3, 6), (6, 3)])
+def test_ties(shape):
+    rng = np.random.default_rng(len(shape) + shape[0])
+    for _ in range(40):
+        check(rng.integers(0, 3, shape).astype(float))
+
+
+@pytest.mark.parametrize("shape", [(4, 4), (3, 5), (5, 3)])
+def test_forbidden_pairs(shape):
+    rng = np.random.default_rng(shape[0] * 10 + shape[1])
+    checked = 0
+    while checked < 40:
+        cost = rng.uniform(0, 100, shape)
+        cost[rng.random(shape) < 0.4] = np.inf
+        if np.isfinite(brute_force(cost)):
+            check(cost)
+            checked += 1
+
+
+@pytest.mark.parametrize(
+    "cost",
+    [
+        [[np.inf, np.inf], [1.0, 2.0]],
+        [[1.0, np.inf], [2.0, np.inf], [3.0, np.inf]],
+        [[np.inf, 1.0, np.inf], [np.inf, 2.0, np.inf]],
+    ],
+)
+def test_infeasible_raises(cost):
+    with pytest.raises(ValueError):
+        linear_assignment(np.array(cost))
+
+
+def test_transposed_result_is_sorted_by_row():
+    cost = np.array([[5.0, 1.0], [1.0, 5.0], [0.0, 0.5], [9.0, 9.0]])
+    rows, cols = linear_assignment(cost)
+    assert rows.tolist() == [0, 2]
+    assert cols.tolist() == [1, 0]
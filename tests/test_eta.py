@@ -0,0 +1,57 @@
+"""A custom aircraft performance table replaces the built-in one"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from tankerwatch.eta import DEFAULT_PERFORMANCE, PerformanceTable
+from tankerwatch.eta import default_performance, load_performance
+
+CUSTOM = """Aircraft Type,Class,Cruise (kt),Spin-up (min),Turnaround (min),Notes
+C-130,LAT,250,12,30,slower than the built-in figure
+Test Jet 9,VLAT,400,5,50,not in the built-in table
+"""
+
+
+@pytest.fixture
+def custom_csv(tmp_path):
+    path = tmp_path / "performance.csv"
+    path.write_text(CUSTOM)
+    return path
+
+
+def test_load_custom_table(custom_csv):
+    table = PerformanceTable(load_performance(custom_csv))
+    resolved = table.resolve(["c 130", "TEST-JET-9", "DC-10", None])
+    np.testing.assert_array_equal(
+        resolved.cruise_kt, [250, 400, DEFAULT_PERFORMANCE[1], DEFAULT_PERFORMANCE[1]]
+    )
+    np.testing.assert_array_equal(resolved.spinup_min[:2], [12, 5])
+    np.testing.assert_array_equal(resolved.turnaround_min[:2], [30, 50])
+    assert resolved.known.tolist() == [True, True, False, False]
+
+
+def test_missing_column_is_rejected(tmp_path):
+    path = tmp_path / "performance.csv"
+    path.write_text("Aircraft Type,Cruise (kt)\nC-130,250\n")
+    with pytest.raises(KeyError):
+        load_performance(path)
+
+
+def test_configured_table_is_the_default(custom_csv):
+    assert default_performance(str(custom_csv)).loc["Test Jet 9", "Cruise (kt)"] == 400
+    script = (
+        "from tankerwatch.eta import PerformanceTable;"
+        "print(PerformanceTable().resolve(['Test Jet 9']).cruise_kt[0])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env={**os.environ, "TANKERWATCH_PERFORMANCE": str(custom_csv)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert float(result.stdout) == 400
@@ -0,0 +1,147 @@
+"""FleetState's incremental updates must equal a full recompute of the table"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tankerwatch.core import DISTANCE_COLUMN, tanker_positions
+from tankerwatch.data import TANKER_COLUMNS
+from tankerwatch.eta import CYCLE_COLUMN, ETA_COLUMN, PerformanceTable
+from tankerwatch.eta import cycle_minutes, eta_minutes
+from tankerwatch.fleet import FleetState
+from tankerwatch.geodesy import distances_nm
+from tankerwatch.icao import IcaoIndex
+
+CODES = [f"K{chr(65 + i)}{chr(65 + j)}" for i in range(4) for j in range(3)]
+UNKNOWN = ["KZZZ", "XXXX"]
+TYPES = ["C-130", "BAE 146", "BAE-146", "RJ85", "MD-87", "DC-10", "Mystery Jet"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    rng = np.random.default_rng(3)
+    return IcaoIndex(
+        CODES, rng.uniform(32, 48, len(CODES)), rng.uniform(-124, -104, len(CODES))
+    )
+
+
+def random_row(rng, partial=False):
+    row = {
+        "Tanker Number": f"T{rng.integers(1000)}",
+        "Aircraft Type": str(rng.choice(TYPES)),
+        "Airport": str(rng.choice(CODES + UNKNOWN)),
+    }
+    if partial:  # editor rows often arrive with only some cells filled
+        for column in rng.choice(TANKER_COLUMNS, rng.integers(1, 3), replace=False):
+            del row[column]
+    return row
+
+
+def original_table(rng, n=30):
+    rows = [random_row(rng) for _ in range(n)]
+    # Several tankers at one airport, so labels share anchors
+    for row in rows[:6]:
+        row["Airport"] = CODES[0]
+    return pd.DataFrame(rows, columns=TANKER_COLUMNS).astype("str")
+
+
+def mutate(rng, edits, n):
+    """Advance the editor's cumulative deltas by one random user action"""
+    action = rng.choice(
+        ["edit", "add", "change_added", "delete", "undelete", "drop_added"]
+    )
+    if action == "edit":
+        key = int(rng.integers(n))
+        column = str(rng.choice(TANKER_COLUMNS))
+        edits["edited_rows"].setdefault(key, {})[column] = random_row(rng)[column]
+    elif action == "add":
+        edits["added_rows"].append(random_row(rng, partial=rng.random() < 0.5))
+    elif action == "change_added" and edits["added_rows"]:
+        i = int(rng.integers(len(edits["added_rows"])))
+        edits["added_rows"][i] = {**edits["added_rows"][i], **random_row(rng, True)}
+    elif action == "delete":
+        edits["deleted_rows"].append(int(rng.integers(n)))
+    elif action == "undelete" and edits["deleted_rows"]:
+        edits["deleted_rows"].pop(int(rng.integers(len(edits["deleted_rows"]))))
+    elif action == "drop_added" and edits["added_rows"]:
+        edits["added_rows"].pop()
+
+
+def recompute(original, edits, index, location):
+    """The table FleetState should hold, built from scratch"""
+    table = original.copy()
+    for key, values in edits["edited_rows"].items():
+        for column, value in values.items():
+            table.loc[key, column] = value
+    table = table.drop(index=sorted(set(edits["deleted_rows"])))
+    added = pd.DataFrame(
+        [{c: row.get(c) for c in TANKER_COLUMNS} for row in edits["added_rows"]],
+        index=range(len(original), len(original) + len(edits["added_rows"])),
+        columns=TANKER_COLUMNS,
+    ).astype(original.dtypes.to_dict())
+    table = pd.concat([table, added])
+
+    resolved = index.resolve(table["Airport"])
+    table = table.assign(LAT=resolved.lat, LON=resolved.lon)
+    cruise, spinup, turnaround, _ = PerformanceTable().resolve(table["Aircraft Type"])
+    distance = distances_nm(location, table["LAT"], table["LON"])
+    table[DISTANCE_COLUMN] = distance
+    table[ETA_COLUMN] = eta_minutes(distance, cruise, spinup)
+    table[CYCLE_COLUMN] = cycle_minutes(distance, cruise, turnaround)
+    table["label_text"] = tanker_positions(table[TANKER_COLUMNS], resolved)[
+        "label_text"
+    ]
+    return table
+
+
+def assert_same(fleet, expected):
+    frame = fleet.frame.sort_index()
+    assert frame.index.tolist() == expected.index.tolist()
+    for column in TANKER_COLUMNS + ["label_text"]:
+        assert (
+            frame[column].astype(object).where(frame[column].notna(), None).tolist()
+            == expected[column]
+            .astype(object)
+            .where(expected[column].notna(), None)
+            .tolist()
+        ), column
+    for column in ["LAT", "LON", DISTANCE_COLUMN, ETA_COLUMN, CYCLE_COLUMN]:
+        np.testing.assert_allclose(
+            frame[column].to_numpy(float),
+            expected[column].to_numpy(float),
+            err_msg=column,
+        )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_matches_recompute(index, seed):
+    rng = np.random.default_rng(seed)
+    original = original_table(rng)
+    location = (40.0, -115.0)
+    fleet = FleetState(original, index, location=location)
+    edits = {"edited_rows": {}, "added_rows": [], "deleted_rows": []}
+    for step in range(30):
+        mutate(rng, edits, len(original))
+        if step % 7 == 6:
+            location = (float(rng.uniform(33, 47)), float(rng.uniform(-123, -105)))
+            fleet.set_location(location)
+        # The editor hands over its state as fresh containers on every rerun.
+        fleet.apply_edits(
+            {
+                "edited_rows": {
+                    str(k): dict(v) for k, v in edits["edited_rows"].items()
+                },
+                "added_rows": [dict(row) for row in edits["added_rows"]],
+                "deleted_rows": list(edits["deleted_rows"]),
+            }
+        )
+        assert_same(fleet, recompute(original, edits, index, location))
+
+
+def test_partial_added_row_is_labelled(index):
+    original = original_table(np.random.default_rng(0), n=4)
+    fleet = FleetState(original, index, location=(40.0, -115.0))
+    fleet.apply_edits({"added_rows": [{"Airport": CODES[1]}]})
+    added = fleet.frame.loc[len(original)]
+    assert added["label_text"] == "\n" + CODES[1]
+    assert fleet.frame["Tanker Number"].dtype == original["Tanker Number"].dtype